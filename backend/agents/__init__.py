@@ -1,11 +1,22 @@
 """
 AP2 Travel Agent - Agents Module
+
+Agent modules and their singletons are loaded lazily on first attribute
+access (PEP 562), so importing one agent does not construct the others.
 """
 
-from .shopping_agent import shopping_agent, ShoppingAgent
-from .merchant_agent import merchant_agent, MerchantAgent
-from .credentials_agent import credentials_agent, CredentialsAgent
-from .payment_agent import payment_agent, PaymentAgent
+from importlib import import_module
+
+_EXPORTS = {
+    'shopping_agent': '.shopping_agent',
+    'ShoppingAgent': '.shopping_agent',
+    'merchant_agent': '.merchant_agent',
+    'MerchantAgent': '.merchant_agent',
+    'credentials_agent': '.credentials_agent',
+    'CredentialsAgent': '.credentials_agent',
+    'payment_agent': '.payment_agent',
+    'PaymentAgent': '.payment_agent',
+}
 
 __all__ = [
     'shopping_agent', 'ShoppingAgent',
@@ -13,3 +24,12 @@ __all__ = [
     'credentials_agent', 'CredentialsAgent',
     'payment_agent', 'PaymentAgent',
 ]
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -3,15 +3,15 @@ Credentials Agent - Payment credential tokenizer
 Simulates a payment vault (like Google Pay) for tokenizing payment methods
 """
 
-import uuid
-from datetime import datetime
-from typing import Dict, Any, List, Optional
-
+import functools
+import logging
+import os
 import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from time import gmtime, strftime, time as _time
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Sequence, Tuple
 
-from config import CREDENTIALS_AGENT_ID
+from config import CREDENTIALS_AGENT_ID, CREDENTIALS_AGENT_URL
 from utils import (
     get_logger,
     generate_device_signature,
@@ -19,6 +19,123 @@ from utils import (
 
 logger = get_logger("CredentialsAgent")
 
+# Interned wallet field values (type / network) for identity-fast comparisons
+_i = sys.intern
+_CARD = _i("CARD")
+
+# Base URL for transaction token detail lookups
+_TOKEN_URL_PREFIX = f"{CREDENTIALS_AGENT_URL}/tokens/"
+
+# Token prefixes accepted by validate_token
+_VALID_PREFIXES = ("tok_", "txn_tok_")
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_valid_prefix(token: str) -> bool:
+    """Prefix validity check, memoized for repeat validations (bounded)."""
+    return token.startswith(_VALID_PREFIXES)
+
+
+# Per-second cache of the formatted UTC timestamp prefix: [epoch_second, "YYYY-MM-DDTHH:MM:SS"]
+_last_sec = [0, ""]
+
+
+def _utc_iso_now() -> str:
+    """
+    Current UTC time in ISO 8601 format (microsecond precision).
+    The seconds prefix is formatted at most once per second.
+    """
+    t = _time()
+    s = int(t)
+    if s != _last_sec[0]:
+        _last_sec[:] = [s, strftime("%Y-%m-%dT%H:%M:%S", gmtime(s))]
+    return f"{_last_sec[1]}.{int((t - s) * 1e6):06d}"
+
+
+def _build_token_details(method: Mapping[str, Any]) -> Mapping[str, Any]:
+    """Build the read-only token details response for a saved method."""
+    return MappingProxyType({
+        "token": method["token"],
+        "type": method["type"],
+        "network": method["network"],
+        "last4": method["last4"],
+        "valid": True
+    })
+
+
+def _build_pm_subdict(method: Mapping[str, Any]) -> Mapping[str, Any]:
+    """Build the read-only payment_method block of a tokenization result."""
+    return MappingProxyType({
+        "type": method["type"],
+        "network": method["network"],
+        "last4": method["last4"]
+    })
+
+
+# Mock saved payment methods (simulated wallet), shared read-only by all instances
+_DEMO_METHODS = tuple(MappingProxyType(m) for m in [
+    {
+        "token": "tok_visa_4242",
+        "type": _CARD,
+        "network": _i("Visa"),
+        "last4": "4242",
+        "display_name": "Visa ending in 4242",
+        "is_default": True,
+        "expires": "12/28"
+    },
+    {
+        "token": "tok_mc_5555",
+        "type": _CARD,
+        "network": _i("Mastercard"),
+        "last4": "5555",
+        "display_name": "Mastercard ending in 5555",
+        "is_default": False,
+        "expires": "03/27"
+    },
+    {
+        "token": "tok_amex_1111",
+        "type": _CARD,
+        "network": _i("Amex"),
+        "last4": "1111",
+        "display_name": "American Express ending in 1111",
+        "is_default": False,
+        "expires": "09/26"
+    }
+])
+
+_SAVED = MappingProxyType({"demo_user": _DEMO_METHODS})
+
+# Secondary index: token -> (user_id, method) for O(1) lookups
+_TOKEN_INDEX: Mapping[str, Tuple[str, Mapping[str, Any]]] = MappingProxyType({
+    method["token"]: (user_id, method)
+    for user_id, methods in _SAVED.items()
+    for method in methods
+})
+
+# Precomputed read-only token detail responses
+_TOKEN_DETAILS: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    token: _build_token_details(method)
+    for token, (_, method) in _TOKEN_INDEX.items()
+})
+
+# Per-method payment_method sub-dicts embedded in tokenization results
+_PM_SUBDICT: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+    token: _build_pm_subdict(method)
+    for token, (_, method) in _TOKEN_INDEX.items()
+})
+
+# Static shape of a tokenization result (copied and filled in per call)
+_RESULT_TEMPLATE: Dict[str, Any] = {
+    "success": True,
+    "transaction_token": None,
+    "original_token": None,
+    "payment_method": None,
+    "device_signature": None,
+    "token_url": None,
+    "expires_at": None,
+    "amount_usd": None
+}
+
 
 class CredentialsAgent:
     """
@@ -31,56 +148,49 @@ class CredentialsAgent:
     4. Generate device-backed signatures
     """
 
+    __slots__ = (
+        "agent_id",
+        "saved_payment_methods",
+        "_token_index",
+        "_token_details_cache",
+        "_pm_subdict",
+    )
+
     def __init__(self):
         self.agent_id = CREDENTIALS_AGENT_ID
 
-        # Mock saved payment methods (simulated wallet)
-        self.saved_payment_methods = {
-            "demo_user": [
-                {
-                    "token": "tok_visa_4242",
-                    "type": "CARD",
-                    "network": "Visa",
-                    "last4": "4242",
-                    "display_name": "Visa ending in 4242",
-                    "is_default": True,
-                    "expires": "12/28"
-                },
-                {
-                    "token": "tok_mc_5555",
-                    "type": "CARD",
-                    "network": "Mastercard",
-                    "last4": "5555",
-                    "display_name": "Mastercard ending in 5555",
-                    "is_default": False,
-                    "expires": "03/27"
-                },
-                {
-                    "token": "tok_amex_1111",
-                    "type": "CARD",
-                    "network": "Amex",
-                    "last4": "1111",
-                    "display_name": "American Express ending in 1111",
-                    "is_default": False,
-                    "expires": "09/26"
-                }
-            ]
+        # Shared immutable wallet and its precomputed lookups
+        self.saved_payment_methods = _SAVED
+        self._token_index = _TOKEN_INDEX
+        self._token_details_cache = _TOKEN_DETAILS
+        self._pm_subdict = _PM_SUBDICT
+
+    @staticmethod
+    def _txn_token_details(token: str) -> Dict[str, Any]:
+        """Build the token details response for a transaction token."""
+        return {
+            "token": token,
+            "type": _CARD,
+            "is_transaction_token": True,
+            "valid": True
         }
 
-    def get_payment_methods(self, user_id: str) -> List[Dict[str, Any]]:
+    def get_payment_methods(self, user_id: str) -> Sequence[Mapping[str, Any]]:
         """
         Get available payment methods for a user.
         Returns tokenized references - never actual card numbers.
+        The result is an immutable tuple of read-only mappings shared with the vault.
         """
-        logger.info(f"Getting payment methods for user: {user_id}")
+        logger.info("Getting payment methods for user: %s", user_id)
 
         # Return saved methods for known user, or default demo methods
         methods = self.saved_payment_methods.get(
             user_id,
-            self.saved_payment_methods.get("demo_user", [])
+            self.saved_payment_methods.get("demo_user", ())
         )
 
-        logger.info(f"Returning {len(methods)} payment methods")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Returning %d payment methods", len(methods))
 
         return methods
 
@@ -94,43 +204,33 @@ class CredentialsAgent:
         Create a one-time use tokenization for a payment.
         In production, this would interact with a payment network.
         """
-        logger.info(f"Tokenizing payment for user {user_id}, token {payment_token}")
+        logger.info("Tokenizing payment for user %s, token %s", user_id, payment_token)
 
-        # Find the payment method
-        methods = self.get_payment_methods(user_id)
-        selected_method = None
+        # Find the payment method; it must belong to this user's wallet
+        # (unknown users fall back to the demo wallet, as in get_payment_methods)
+        owner = user_id if user_id in self.saved_payment_methods else "demo_user"
+        entry = self._token_index.get(payment_token)
 
-        for method in methods:
-            if method["token"] == payment_token:
-                selected_method = method
-                break
-
-        if not selected_method:
-            logger.warning(f"Payment token not found: {payment_token}")
+        if entry is None or entry[0] != owner:
+            logger.warning("Payment token not found: %s", payment_token)
             return {"error": "Payment token not found"}
 
         # Generate a transaction-specific token
-        transaction_token = f"txn_tok_{uuid.uuid4().hex[:12]}"
+        transaction_token = "txn_tok_" + os.urandom(6).hex()
 
         # Generate device signature
         device_signature = generate_device_signature(user_id, transaction_token)
 
-        result = {
-            "success": True,
-            "transaction_token": transaction_token,
-            "original_token": payment_token,
-            "payment_method": {
-                "type": selected_method["type"],
-                "network": selected_method["network"],
-                "last4": selected_method["last4"]
-            },
-            "device_signature": device_signature,
-            "token_url": f"http://localhost:8002/tokens/{transaction_token}",
-            "expires_at": datetime.utcnow().isoformat(),
-            "amount_usd": amount_usd
-        }
+        result = _RESULT_TEMPLATE.copy()
+        result["transaction_token"] = transaction_token
+        result["original_token"] = payment_token
+        result["payment_method"] = self._pm_subdict[payment_token]
+        result["device_signature"] = device_signature
+        result["token_url"] = _TOKEN_URL_PREFIX + transaction_token
+        result["expires_at"] = _utc_iso_now()
+        result["amount_usd"] = amount_usd
 
-        logger.info(f"Tokenization successful: {transaction_token}")
+        logger.info("Tokenization successful: %s", transaction_token)
 
         return result
 
@@ -139,47 +239,34 @@ class CredentialsAgent:
         Validate a payment token.
         In production, this would verify with the payment network.
         """
-        logger.info(f"Validating token: {token}")
+        logger.info("Validating token: %s", token)
 
         # For demo purposes, all tokens starting with our prefixes are valid
-        is_valid = (
-            token.startswith("tok_") or
-            token.startswith("txn_tok_")
-        )
-
         return {
-            "valid": is_valid,
+            "valid": _is_valid_prefix(token),
             "token": token,
-            "validated_at": datetime.utcnow().isoformat()
+            "validated_at": _utc_iso_now()
         }
 
-    def get_token_details(self, token: str) -> Optional[Dict[str, Any]]:
+    def get_token_details(self, token: str) -> Optional[Mapping[str, Any]]:
         """
         Get details about a specific token.
+        Saved-method details are served from a read-only cache.
         """
-        # Check all users' payment methods
-        for user_id, methods in self.saved_payment_methods.items():
-            for method in methods:
-                if method["token"] == token:
-                    return {
-                        "token": token,
-                        "type": method["type"],
-                        "network": method["network"],
-                        "last4": method["last4"],
-                        "valid": True
-                    }
-
-        # Transaction tokens are valid too
-        if token.startswith("txn_tok_"):
-            return {
-                "token": token,
-                "type": "CARD",
-                "is_transaction_token": True,
-                "valid": True
-            }
-
-        return None
-
-
-# Singleton instance
-credentials_agent = CredentialsAgent()
+        # Saved payment methods first, then transaction tokens
+        return self._token_details_cache.get(token) or (
+            self._txn_token_details(token) if token.startswith("txn_tok_") else None
+        )
+
+
+@functools.cache
+def get_credentials_agent() -> CredentialsAgent:
+    """Return the singleton instance, constructing it on first use."""
+    return CredentialsAgent()
+
+
+def __getattr__(name):
+    # Singleton instance, created lazily
+    if name == "credentials_agent":
+        return get_credentials_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
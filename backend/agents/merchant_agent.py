@@ -3,17 +3,21 @@ Merchant Agent - Travel catalog and cart builder
 Handles intent mandates and generates travel packages
 """
 
+import asyncio
+import functools
+import hashlib
 import json
 import os
-import uuid
+import itertools
+import re
+import secrets
 import time
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Any, Optional, List, Sequence, Tuple
 import httpx
-
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import orjson
+from pydantic import TypeAdapter
 
 from config import (
     OPENROUTER_API_KEY,
@@ -37,10 +41,239 @@ from utils import (
     sign_mandate,
     generate_merchant_signature,
     hash_cart,
+    ThinkFilter,
+    JsonObjectScanner,
+    iter_sse_content,
 )
 
 logger = get_logger("MerchantAgent")
 
+# JSON repair patterns for LLM output (see MerchantAgent._repair_json)
+_RE_TRAILING_COMMA = re.compile(r',(\s*[\]\}])')
+_RE_MISSING_COMMA_OBJ = re.compile(r'(\})\s*(\{)')
+_RE_MISSING_COMMA_ARR = re.compile(r'(\])\s*(\[)')
+_RE_MISSING_COMMA_STR = re.compile(r'(")\s*\n\s*(")')
+
+# JSON extraction patterns for LLM output (see MerchantAgent._extract_json)
+_RE_THINK = re.compile(r'<think>.*?</think>', re.DOTALL)
+_RE_FENCE = re.compile(r'```(?:json)?\s*(\{.*\})\s*```', re.DOTALL)
+_RE_OBJ = re.compile(r'\{.*\}', re.DOTALL)
+
+# LLM prompt templates (str.format placeholders; literal braces are doubled)
+_PROMPT_TEMPLATE = """You are a travel merchant AI. Generate 3 realistic travel package options for:
+- Destination: {destination}
+- Origin: {origin}
+- Travel dates: {start_date} to {end_date} ({nights} nights)
+- Travelers: {travelers}
+- Budget: ${budget} USD
+- Class preference: {cabin_class}
+- Preferences: {preferences}
+
+Generate exactly 3 packages (value, recommended, premium) as JSON:
+{{
+  "packages": [
+    {{
+      "tier": "value",
+      "flights": [
+        {{
+          "flight_id": "unique_id",
+          "airline": "airline name",
+          "flight_number": "XX-123",
+          "departure_city": "{origin}",
+          "arrival_city": "{destination}",
+          "departure_time": "datetime",
+          "arrival_time": "datetime",
+          "cabin_class": "{cabin_class}",
+          "price_per_person_usd": number,
+          "refundable": true
+        }}
+      ],
+      "hotels": [
+        {{
+          "hotel_id": "unique_id",
+          "name": "hotel name",
+          "location": "{destination}",
+          "star_rating": 4,
+          "price_per_night_usd": number,
+          "nights": {nights},
+          "check_in": "{start_date}",
+          "check_out": "{end_date}",
+          "room_type": "Deluxe Room",
+          "refundable": true
+        }}
+      ],
+      "activities": [
+        {{
+          "activity_id": "unique_id",
+          "name": "activity name",
+          "description": "brief description",
+          "price_per_person_usd": number,
+          "duration": "3 hours",
+          "included": ["item1", "item2"]
+        }}
+      ],
+      "total_usd": number,
+      "description": "brief package description"
+    }}
+  ]
+}}
+
+Requirements:
+- Value package: ~60-70% of budget, 3-4 star hotels, fewer activities
+- Recommended package: ~80-90% of budget, 5-star hotels, more activities
+- Premium package: at or slightly above budget, luxury options, VIP experiences
+- Include realistic airline names for the route
+- Include real hotel names in {destination}
+- Include popular tourist activities
+- Make sure prices are realistic
+
+Return ONLY the JSON object starting with {{ - no thinking, no explanation, no markdown."""
+
+# Simplified retry prompt, one per tier so the three calls can run concurrently
+_SIMPLE_PROMPT_HEADER = """Generate 1 {tier} travel package as JSON for {travelers} travelers going from {origin} to {destination} for {nights} nights ({start_date} to {end_date}). Budget: ${budget}.
+
+Return ONLY this JSON structure, no other text:
+{{"packages":[
+"""
+
+_SIMPLE_TIER_ROWS = {
+    "value": '''{{"tier":"value","flights":[{{"airline":"Economy Air","flight_number":"EA101","departure_city":"{origin}","arrival_city":"{destination}","departure_time":"{start_date}T08:00:00","arrival_time":"{start_date}T14:00:00","cabin_class":"{cabin_class}","price_per_person_usd":400,"refundable":true}}],"hotels":[{{"name":"City Inn","location":"{destination}","star_rating":3,"price_per_night_usd":100,"nights":{nights},"check_in":"{start_date}","check_out":"{end_date}","room_type":"Standard","refundable":true}}],"activities":[{{"name":"City Tour","description":"Sightseeing","price_per_person_usd":50,"duration":"3 hours","included":["Guide"]}}],"total_usd":{tier_budget},"description":"Budget-friendly option"}}''',
+    "recommended": '''{{"tier":"recommended","flights":[{{"airline":"Premium Air","flight_number":"PA202","departure_city":"{origin}","arrival_city":"{destination}","departure_time":"{start_date}T10:00:00","arrival_time":"{start_date}T16:00:00","cabin_class":"{cabin_class}","price_per_person_usd":600,"refundable":true}}],"hotels":[{{"name":"Grand Hotel","location":"{destination}","star_rating":4,"price_per_night_usd":200,"nights":{nights},"check_in":"{start_date}","check_out":"{end_date}","room_type":"Deluxe","refundable":true}}],"activities":[{{"name":"Premium Tour","description":"VIP Experience","price_per_person_usd":100,"duration":"5 hours","included":["Guide","Lunch"]}}],"total_usd":{tier_budget},"description":"Best value package"}}''',
+    "premium": '''{{"tier":"premium","flights":[{{"airline":"Luxury Airways","flight_number":"LA303","departure_city":"{origin}","arrival_city":"{destination}","departure_time":"{start_date}T12:00:00","arrival_time":"{start_date}T18:00:00","cabin_class":"business","price_per_person_usd":900,"refundable":true}}],"hotels":[{{"name":"Luxury Resort","location":"{destination}","star_rating":5,"price_per_night_usd":400,"nights":{nights},"check_in":"{start_date}","check_out":"{end_date}","room_type":"Suite","refundable":true}}],"activities":[{{"name":"Exclusive Tour","description":"Private guide","price_per_person_usd":200,"duration":"Full day","included":["Guide","Meals","Transport"]}}],"total_usd":{tier_budget},"description":"Luxury experience"}}''',
+}
+
+_SIMPLE_TIER_PROMPTS = {
+    tier: _SIMPLE_PROMPT_HEADER + row + "\n]}}"
+    for tier, row in _SIMPLE_TIER_ROWS.items()
+}
+
+# (tier, share of budget) for the simplified per-tier prompts
+_SIMPLE_TIERS = (("value", 0.6), ("recommended", 0.85), ("premium", 1.1))
+
+# Validates a whole LLM-generated package list in one call
+_PACKAGES_ADAPTER = TypeAdapter(List[TravelPackage])
+
+# Item IDs (flights/hotels/activities): per-process random tag + counter.
+# Unique within a process and unlikely to repeat across restarts.
+_ID_TAG = secrets.token_hex(2)
+_next_id = itertools.count(1).__next__
+
+
+def _short_id(prefix: str) -> str:
+    """Generate a cheap unique item ID such as "fl_3fa2000001"."""
+    return f"{prefix}_{_ID_TAG}{_next_id():06x}"
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_ymd(value: str) -> Optional[date]:
+    """Parse a YYYY-MM-DD travel date, or None if it is malformed."""
+    if len(value) != 10 or value.count("-") != 2:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _nights_between(start_date: Any, end_date: Any, default: int = 5) -> int:
+    """Number of nights between two YYYY-MM-DD dates, or default if either is invalid."""
+    start = _parse_ymd(start_date) if isinstance(start_date, str) else None
+    end = _parse_ymd(end_date) if isinstance(end_date, str) else None
+    if start is None or end is None:
+        return default
+    return (end - start).days
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_expiry(value: str) -> datetime:
+    """Parse an ISO-8601 mandate expiry, accepting a trailing "Z" for UTC."""
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
+
+
+# Exact-match cache of LLM-generated packages, keyed on the normalized intent
+_LLM_CACHE_MAXSIZE = 512
+_LLM_CACHE_TTL_SECONDS = 3600
+_LLM_CACHE: "OrderedDict[str, Tuple[float, Tuple[Dict[str, Any], ...]]]" = OrderedDict()
+
+
+def _llm_cache_key(*intent: Any) -> str:
+    """Hash the normalized shopping intent into a compact cache key."""
+    return hashlib.blake2b(orjson.dumps(intent), digest_size=16).hexdigest()
+
+
+def _llm_cache_get(key: str) -> Optional[Tuple[Dict[str, Any], ...]]:
+    """Return cached package templates for key, dropping expired entries."""
+    entry = _LLM_CACHE.get(key)
+    if entry is None:
+        return None
+    expires_at, templates = entry
+    if expires_at < time.monotonic():
+        del _LLM_CACHE[key]
+        return None
+    _LLM_CACHE.move_to_end(key)
+    return templates
+
+
+def _llm_cache_put(key: str, templates: Tuple[Dict[str, Any], ...]) -> None:
+    """Store package templates for key, evicting the least recently used."""
+    _LLM_CACHE[key] = (time.monotonic() + _LLM_CACHE_TTL_SECONDS, templates)
+    _LLM_CACHE.move_to_end(key)
+    if len(_LLM_CACHE) > _LLM_CACHE_MAXSIZE:
+        _LLM_CACHE.popitem(last=False)
+
+
+OPENROUTER_CHAT_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# Shared OpenRouter client - keeps connections alive across package generations
+_HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+async def _get_client() -> httpx.AsyncClient:
+    """Return the shared OpenRouter HTTP client, creating it on first use."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None or _HTTP_CLIENT.is_closed:
+        _HTTP_CLIENT = httpx.AsyncClient(
+            timeout=OPENROUTER_TIMEOUT,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            headers={
+                "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+                "Content-Type": "application/json"
+            }
+        )
+    return _HTTP_CLIENT
+
+
+async def _stream_json_object(
+    client: httpx.AsyncClient, body: bytes
+) -> Tuple[str, Optional[str]]:
+    """
+    POST a streaming chat completion and stop once the first JSON object closes.
+
+    Returns (visible text received, JSON object text or None); leaving the
+    stream early closes the connection and cancels any trailing generation.
+    """
+    think = ThinkFilter()
+    scanner = JsonObjectScanner()
+    async with client.stream("POST", OPENROUTER_CHAT_URL, content=body) as resp:
+        resp.raise_for_status()
+        async for content in iter_sse_content(resp):
+            obj = scanner.feed(think.feed(content))
+            if obj is not None:
+                return scanner.text, obj
+    obj = scanner.feed(think.flush())
+    return scanner.text, obj
+
+
+async def close_http_client() -> None:
+    """Close the shared OpenRouter HTTP client (call on server shutdown)."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is not None:
+        await _HTTP_CLIENT.aclose()
+        _HTTP_CLIENT = None
+
 
 class MerchantAgent:
     """
@@ -56,6 +289,12 @@ class MerchantAgent:
     def __init__(self):
         self.merchant_id = MERCHANT_ID
         self.merchant_name = MERCHANT_NAME
+        # Static fields shared by every process_intent_mandate response
+        self._response_skeleton = {
+            "merchant_id": self.merchant_id,
+            "merchant_name": self.merchant_name,
+            "merchant_agent_url": MERCHANT_AGENT_URL,
+        }
 
     async def process_intent_mandate(
         self,
@@ -83,7 +322,8 @@ class MerchantAgent:
             spending_limits=intent_mandate.get("spending_limits", {})
         )
 
-        # Add merchant signatures to each package
+        # Serialize each package once and attach its merchant signature
+        package_dicts = []
         for package in packages:
             package_dict = package.model_dump()
             cart_hash = hash_cart(self._package_to_line_items(package_dict))
@@ -91,17 +331,28 @@ class MerchantAgent:
                 self.merchant_id,
                 cart_hash
             )
+            package_dicts.append(package_dict)
 
         logger.info(f"Generated {len(packages)} travel packages")
 
         return {
-            "packages": [p.model_dump() for p in packages],
-            "merchant_id": self.merchant_id,
-            "merchant_name": self.merchant_name,
-            "merchant_agent_url": MERCHANT_AGENT_URL,
+            "packages": package_dicts,
+            **self._response_skeleton,
             "intent_mandate_id": intent_mandate.get("mandate_id")
         }
 
+    async def process_intent_mandate_json(
+        self,
+        intent_mandate: Dict[str, Any],
+        shopping_agent_id: str,
+        risk_data: Optional[str] = None
+    ) -> bytes:
+        """
+        Process an intent mandate and return the result pre-serialized as JSON bytes.
+        """
+        result = await self.process_intent_mandate(intent_mandate, shopping_agent_id, risk_data)
+        return orjson.dumps(result)
+
     def _validate_intent_mandate(self, mandate: Dict[str, Any]) -> bool:
         """Validate the intent mandate structure and expiry."""
         required_fields = ["mandate_id", "shopping_intent", "spending_limits"]
@@ -115,17 +366,10 @@ class MerchantAgent:
         expires_at = mandate.get("expires_at")
         if expires_at:
             try:
-                # Parse expiry time
-                if expires_at.endswith("Z"):
-                    expiry_str = expires_at.replace("Z", "+00:00")
-                else:
-                    expiry_str = expires_at
-
-                expiry = datetime.fromisoformat(expiry_str)
+                expiry = _parse_expiry(expires_at)
 
                 # Compare with UTC now if expiry is timezone-aware
                 if expiry.tzinfo is not None:
-                    from datetime import timezone
                     now = datetime.now(timezone.utc)
                 else:
                     now = datetime.now()
@@ -161,101 +405,51 @@ class MerchantAgent:
         # Always use LLM for package generation
         logger.info(f"Generating LLM packages for {destination} ({travelers} travelers, ${budget} budget)")
 
-        # Calculate nights
-        try:
-            start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-            end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-            nights = (end_dt - start_dt).days
-        except:
-            nights = 5
-
-        prompt = f"""You are a travel merchant AI. Generate 3 realistic travel package options for:
-- Destination: {destination}
-- Origin: {origin}
-- Travel dates: {start_date} to {end_date} ({nights} nights)
-- Travelers: {travelers}
-- Budget: ${budget} USD
-- Class preference: {cabin_class}
-- Preferences: {preferences}
+        nights = _nights_between(start_date, end_date)
 
-Generate exactly 3 packages (value, recommended, premium) as JSON:
-{{
-  "packages": [
-    {{
-      "tier": "value",
-      "flights": [
-        {{
-          "flight_id": "unique_id",
-          "airline": "airline name",
-          "flight_number": "XX-123",
-          "departure_city": "{origin}",
-          "arrival_city": "{destination}",
-          "departure_time": "datetime",
-          "arrival_time": "datetime",
-          "cabin_class": "{cabin_class}",
-          "price_per_person_usd": number,
-          "refundable": true
-        }}
-      ],
-      "hotels": [
-        {{
-          "hotel_id": "unique_id",
-          "name": "hotel name",
-          "location": "{destination}",
-          "star_rating": 4,
-          "price_per_night_usd": number,
-          "nights": {nights},
-          "check_in": "{start_date}",
-          "check_out": "{end_date}",
-          "room_type": "Deluxe Room",
-          "refundable": true
-        }}
-      ],
-      "activities": [
-        {{
-          "activity_id": "unique_id",
-          "name": "activity name",
-          "description": "brief description",
-          "price_per_person_usd": number,
-          "duration": "3 hours",
-          "included": ["item1", "item2"]
-        }}
-      ],
-      "total_usd": number,
-      "description": "brief package description"
-    }}
-  ]
-}}
-
-Requirements:
-- Value package: ~60-70% of budget, 3-4 star hotels, fewer activities
-- Recommended package: ~80-90% of budget, 5-star hotels, more activities
-- Premium package: at or slightly above budget, luxury options, VIP experiences
-- Include realistic airline names for the route
-- Include real hotel names in {destination}
-- Include popular tourist activities
-- Make sure prices are realistic
-
-Return ONLY the JSON object starting with {{ - no thinking, no explanation, no markdown."""
+        # Identical intents reuse the previous LLM output with fresh IDs
+        cache_key = _llm_cache_key(
+            destination, origin, start_date, end_date, travelers, budget, cabin_class, preferences
+        )
+        cached = _llm_cache_get(cache_key)
+        if cached is not None:
+            logger.info(f"LLM package cache hit for {destination}")
+            return [self._instantiate_package(template) for template in cached]
+
+        prompt = _PROMPT_TEMPLATE.format_map({
+            "destination": destination,
+            "origin": origin,
+            "start_date": start_date,
+            "end_date": end_date,
+            "nights": nights,
+            "travelers": travelers,
+            "budget": budget,
+            "cabin_class": cabin_class,
+            "preferences": preferences,
+        })
 
         try:
             start_time = time.time()
 
-            async with httpx.AsyncClient(timeout=OPENROUTER_TIMEOUT) as client:
-                resp = await client.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": OPENROUTER_MODEL,
-                        "messages": [{"role": "user", "content": "/no_think\n" + prompt}],
-                        "temperature": 0.3
-                    }
+            client = await _get_client()
+            request = {
+                "model": OPENROUTER_MODEL,
+                "messages": [{"role": "user", "content": "/no_think\n" + prompt}],
+                "temperature": 0.3
+            }
+            json_text = None
+            try:
+                response_text, json_text = await _stream_json_object(
+                    client, orjson.dumps({**request, "stream": True})
                 )
+            except (httpx.RemoteProtocolError, orjson.JSONDecodeError) as e:
+                # Only a broken stream is retried as a batch request - timeouts and
+                # error statuses would fail the same way, so they go straight to
+                # the simplified-prompt fallback below
+                logger.warning(f"Streaming LLM call failed ({e}), falling back to batch request")
+                resp = await client.post(OPENROUTER_CHAT_URL, content=orjson.dumps(request))
                 resp.raise_for_status()
-                data = resp.json()
+                data = orjson.loads(resp.content)
                 response_text = data.get("choices", [{}])[0].get("message", {}).get("content", "")
 
             duration = time.time() - start_time
@@ -268,60 +462,29 @@ Return ONLY the JSON object starting with {{ - no thinking, no explanation, no m
                 duration_seconds=duration
             )
 
-            # Extract JSON from response
-            json_text = response_text
-
-            # Remove thinking tags if present (some LLMs add these)
-            if "<think>" in json_text:
-                # Extract content after </think>
-                think_end = json_text.find("</think>")
-                if think_end != -1:
-                    json_text = json_text[think_end + 8:]
-
-            # Try code block extraction
-            if "```json" in json_text:
-                json_text = json_text.split("```json")[1].split("```")[0]
-            elif "```" in json_text:
-                json_text = json_text.split("```")[1].split("```")[0]
-
-            # If no code blocks, try to find JSON object directly
-            if not json_text.strip().startswith("{"):
-                # Find first { and last }
-                first_brace = json_text.find("{")
-                last_brace = json_text.rfind("}")
-                if first_brace != -1 and last_brace != -1:
-                    json_text = json_text[first_brace:last_brace + 1]
-
-            json_text = json_text.strip()
-
-            if not json_text:
-                raise json.JSONDecodeError("Empty JSON after extraction", "", 0)
+            # The object closed mid-stream - parse just that span
+            data = self._extract_json(json_text if json_text is not None else response_text)
 
-            # Try to fix common JSON issues from LLM output
-            json_text = self._repair_json(json_text)
-
-            data = json.loads(json_text)
-
-            packages = []
-            for pkg_data in data.get("packages", []):
-                pkg_data["package_id"] = f"pkg_{uuid.uuid4().hex[:8]}"
+            pkg_list = data.get("packages", [])
+            for pkg_data in pkg_list:
+                pkg_data["package_id"] = f"pkg_{secrets.token_hex(4)}"
                 pkg_data["travelers"] = travelers
                 pkg_data["nights"] = nights
 
                 # Ensure all sub-items have IDs
                 for flight in pkg_data.get("flights", []):
-                    if "flight_id" not in flight:
-                        flight["flight_id"] = f"fl_{uuid.uuid4().hex[:6]}"
+                    flight.setdefault("flight_id", _short_id("fl"))
 
                 for hotel in pkg_data.get("hotels", []):
-                    if "hotel_id" not in hotel:
-                        hotel["hotel_id"] = f"ht_{uuid.uuid4().hex[:6]}"
+                    hotel.setdefault("hotel_id", _short_id("ht"))
 
                 for activity in pkg_data.get("activities", []):
-                    if "activity_id" not in activity:
-                        activity["activity_id"] = f"ac_{uuid.uuid4().hex[:6]}"
+                    activity.setdefault("activity_id", _short_id("ac"))
+
+            packages = _PACKAGES_ADAPTER.validate_python(pkg_list)
 
-                packages.append(TravelPackage(**pkg_data))
+            if packages:
+                _llm_cache_put(cache_key, tuple(package.model_dump() for package in packages))
 
             return packages
 
@@ -351,78 +514,91 @@ Return ONLY the JSON object starting with {{ - no thinking, no explanation, no m
         budget: float,
         cabin_class: str
     ) -> List[TravelPackage]:
-        """Generate packages with a simpler, more reliable prompt."""
+        """Generate packages with a simpler, more reliable prompt (one call per tier)."""
+
+        fields = {
+            "destination": destination,
+            "origin": origin,
+            "start_date": start_date,
+            "end_date": end_date,
+            "nights": nights,
+            "travelers": travelers,
+            "budget": budget,
+            "cabin_class": cabin_class,
+        }
 
-        prompt = f"""Generate 3 travel packages as JSON for {travelers} travelers going from {origin} to {destination} for {nights} nights ({start_date} to {end_date}). Budget: ${budget}.
+        results = await asyncio.gather(
+            *(self._gen_tier(tier, share, fields) for tier, share in _SIMPLE_TIERS),
+            return_exceptions=True
+        )
 
-Return ONLY this JSON structure, no other text:
-{{"packages":[
-{{"tier":"value","flights":[{{"airline":"Economy Air","flight_number":"EA101","departure_city":"{origin}","arrival_city":"{destination}","departure_time":"{start_date}T08:00:00","arrival_time":"{start_date}T14:00:00","cabin_class":"{cabin_class}","price_per_person_usd":400,"refundable":true}}],"hotels":[{{"name":"City Inn","location":"{destination}","star_rating":3,"price_per_night_usd":100,"nights":{nights},"check_in":"{start_date}","check_out":"{end_date}","room_type":"Standard","refundable":true}}],"activities":[{{"name":"City Tour","description":"Sightseeing","price_per_person_usd":50,"duration":"3 hours","included":["Guide"]}}],"total_usd":{int(budget*0.6)},"description":"Budget-friendly option"}},
-{{"tier":"recommended","flights":[{{"airline":"Premium Air","flight_number":"PA202","departure_city":"{origin}","arrival_city":"{destination}","departure_time":"{start_date}T10:00:00","arrival_time":"{start_date}T16:00:00","cabin_class":"{cabin_class}","price_per_person_usd":600,"refundable":true}}],"hotels":[{{"name":"Grand Hotel","location":"{destination}","star_rating":4,"price_per_night_usd":200,"nights":{nights},"check_in":"{start_date}","check_out":"{end_date}","room_type":"Deluxe","refundable":true}}],"activities":[{{"name":"Premium Tour","description":"VIP Experience","price_per_person_usd":100,"duration":"5 hours","included":["Guide","Lunch"]}}],"total_usd":{int(budget*0.85)},"description":"Best value package"}},
-{{"tier":"premium","flights":[{{"airline":"Luxury Airways","flight_number":"LA303","departure_city":"{origin}","arrival_city":"{destination}","departure_time":"{start_date}T12:00:00","arrival_time":"{start_date}T18:00:00","cabin_class":"business","price_per_person_usd":900,"refundable":true}}],"hotels":[{{"name":"Luxury Resort","location":"{destination}","star_rating":5,"price_per_night_usd":400,"nights":{nights},"check_in":"{start_date}","check_out":"{end_date}","room_type":"Suite","refundable":true}}],"activities":[{{"name":"Exclusive Tour","description":"Private guide","price_per_person_usd":200,"duration":"Full day","included":["Guide","Meals","Transport"]}}],"total_usd":{int(budget*1.1)},"description":"Luxury experience"}}
-]}}"""
+        failures = [result for result in results if isinstance(result, BaseException)]
+        if len(failures) == len(results):
+            logger.error(f"Simplified LLM also failed: {failures[0]}, using hardcoded packages")
+            # Last resort - return hardcoded packages (still LLM-generated structure)
+            return self._generate_hardcoded_packages(
+                destination, origin, start_date, end_date, nights, travelers, budget, cabin_class
+            )
 
-        try:
-            async with httpx.AsyncClient(timeout=OPENROUTER_TIMEOUT) as client:
-                resp = await client.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": OPENROUTER_MODEL,
-                        "messages": [{"role": "user", "content": "/no_think\n" + prompt}],
-                        "temperature": 0.1
-                    }
-                )
-                resp.raise_for_status()
-                data = resp.json()
-                response_text = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+        packages = []
+        templates = None
+        for index, result in enumerate(results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Simplified LLM failed for {_SIMPLE_TIERS[index][0]} tier: {result}")
+                if templates is None:
+                    templates = _hardcoded_templates(
+                        destination, origin, start_date, end_date, nights, travelers, budget, cabin_class
+                    )
+                packages.append(self._instantiate_package(templates[index]))
+            else:
+                packages.append(result)
+
+        logger.info(f"Generated {len(packages) - len(failures)} packages with simplified LLM prompt")
+        return packages
 
-            # Extract JSON same as main method
-            json_text = response_text
-            if "<think>" in json_text:
-                think_end = json_text.find("</think>")
-                if think_end != -1:
-                    json_text = json_text[think_end + 8:]
-
-            if not json_text.strip().startswith("{"):
-                first_brace = json_text.find("{")
-                last_brace = json_text.rfind("}")
-                if first_brace != -1 and last_brace != -1:
-                    json_text = json_text[first_brace:last_brace + 1]
-
-            json_text = self._repair_json(json_text.strip())
-            data = json.loads(json_text)
-
-            packages = []
-            for pkg_data in data.get("packages", []):
-                pkg_data["package_id"] = f"pkg_{uuid.uuid4().hex[:8]}"
-                pkg_data["travelers"] = travelers
-                pkg_data["nights"] = nights
+    async def _gen_tier(
+        self,
+        tier: str,
+        budget_share: float,
+        fields: Dict[str, Any]
+    ) -> TravelPackage:
+        """Generate a single tier's package with the simplified prompt."""
+        prompt = _SIMPLE_TIER_PROMPTS[tier].format_map({
+            **fields,
+            "tier": tier,
+            "tier_budget": int(fields["budget"] * budget_share),
+        })
+
+        client = await _get_client()
+        resp = await client.post(
+            OPENROUTER_CHAT_URL,
+            content=orjson.dumps({
+                "model": OPENROUTER_MODEL,
+                "messages": [{"role": "user", "content": "/no_think\n" + prompt}],
+                "temperature": 0.1
+            })
+        )
+        resp.raise_for_status()
+        data = orjson.loads(resp.content)
+        response_text = data.get("choices", [{}])[0].get("message", {}).get("content", "")
 
-                for flight in pkg_data.get("flights", []):
-                    if "flight_id" not in flight:
-                        flight["flight_id"] = f"fl_{uuid.uuid4().hex[:6]}"
-                for hotel in pkg_data.get("hotels", []):
-                    if "hotel_id" not in hotel:
-                        hotel["hotel_id"] = f"ht_{uuid.uuid4().hex[:6]}"
-                for activity in pkg_data.get("activities", []):
-                    if "activity_id" not in activity:
-                        activity["activity_id"] = f"ac_{uuid.uuid4().hex[:6]}"
+        data = self._extract_json(response_text)
 
-                packages.append(TravelPackage(**pkg_data))
+        pkg_data = data["packages"][0]
+        pkg_data["package_id"] = f"pkg_{secrets.token_hex(4)}"
+        pkg_data["tier"] = tier
+        pkg_data["travelers"] = fields["travelers"]
+        pkg_data["nights"] = fields["nights"]
 
-            logger.info(f"Generated {len(packages)} packages with simplified LLM prompt")
-            return packages
+        for flight in pkg_data.get("flights", []):
+            flight.setdefault("flight_id", _short_id("fl"))
+        for hotel in pkg_data.get("hotels", []):
+            hotel.setdefault("hotel_id", _short_id("ht"))
+        for activity in pkg_data.get("activities", []):
+            activity.setdefault("activity_id", _short_id("ac"))
 
-        except Exception as e:
-            logger.error(f"Simplified LLM also failed: {e}, using hardcoded packages")
-            # Last resort - return hardcoded packages (still LLM-generated structure)
-            return self._generate_hardcoded_packages(
-                destination, origin, start_date, end_date, nights, travelers, budget, cabin_class
-            )
+        # Validate the same way as the batch path in _generate_travel_packages
+        return _PACKAGES_ADAPTER.validate_python([pkg_data])[0]
 
     def _generate_hardcoded_packages(
         self,
@@ -438,73 +614,47 @@ Return ONLY this JSON structure, no other text:
         """Generate hardcoded packages as last resort."""
         logger.info("Using hardcoded package structure")
 
-        packages = []
-        tiers = [
-            ("value", 0.6, 3, "Budget-friendly package"),
-            ("recommended", 0.85, 4, "Best value - our top pick"),
-            ("premium", 1.1, 5, "Luxury experience")
-        ]
-
-        for tier, price_mult, stars, desc in tiers:
-            pkg = TravelPackage(
-                package_id=f"pkg_{uuid.uuid4().hex[:8]}",
-                tier=tier,
-                flights=[Flight(
-                    flight_id=f"fl_{uuid.uuid4().hex[:6]}",
-                    airline="Travel Airways",
-                    flight_number=f"TA{100 + len(packages)}",
-                    departure_city=origin,
-                    arrival_city=destination,
-                    departure_time=f"{start_date}T10:00:00",
-                    arrival_time=f"{start_date}T16:00:00",
-                    cabin_class=cabin_class if tier != "premium" else "business",
-                    price_per_person_usd=int(400 * price_mult),
-                    refundable=True
-                )],
-                hotels=[Hotel(
-                    hotel_id=f"ht_{uuid.uuid4().hex[:6]}",
-                    name=f"{destination} {'Inn' if tier == 'value' else 'Grand Hotel' if tier == 'recommended' else 'Luxury Resort'}",
-                    location=destination,
-                    star_rating=stars,
-                    price_per_night_usd=int(150 * price_mult),
-                    nights=nights,
-                    check_in=start_date,
-                    check_out=end_date,
-                    room_type="Standard" if tier == "value" else "Deluxe" if tier == "recommended" else "Suite",
-                    refundable=True
-                )],
-                activities=[Activity(
-                    activity_id=f"ac_{uuid.uuid4().hex[:6]}",
-                    name=f"{destination} Tour",
-                    description="Explore the city highlights",
-                    price_per_person_usd=int(50 * price_mult),
-                    duration="4 hours",
-                    included=["Guide", "Water"] if tier == "value" else ["Guide", "Lunch", "Transport"]
-                )],
-                total_usd=int(budget * price_mult),
-                travelers=travelers,
-                nights=nights,
-                description=desc
-            )
-            packages.append(pkg)
+        templates = _hardcoded_templates(
+            destination, origin, start_date, end_date, nights, travelers, budget, cabin_class
+        )
+        return [self._instantiate_package(template) for template in templates]
 
-        return packages
+    def _extract_json(self, response_text: str) -> Dict[str, Any]:
+        """
+        Extract and parse the JSON object from an LLM response.
+        Strips <think> blocks and markdown code fences, then parses, repairing
+        only if the extracted text is not already valid JSON.
+        """
+        text = _RE_THINK.sub("", response_text) if "<think>" in response_text else response_text
+
+        # Prefer a fenced code block, otherwise the outermost {...} span
+        match = _RE_FENCE.search(text)
+        if match:
+            json_text = match.group(1)
+        else:
+            match = _RE_OBJ.search(text)
+            if not match:
+                raise json.JSONDecodeError("No JSON object in LLM response", text, 0)
+            json_text = match.group(0)
+
+        try:
+            return orjson.loads(json_text)
+        except orjson.JSONDecodeError:
+            return orjson.loads(self._repair_json(json_text))
 
     def _repair_json(self, json_text: str) -> str:
         """Attempt to repair common JSON issues from LLM output."""
-        import re
-
         text = json_text
 
         # Remove trailing commas before ] or }
-        text = re.sub(r',(\s*[\]\}])', r'\1', text)
+        text = _RE_TRAILING_COMMA.sub(r'\1', text)
 
         # Fix missing commas between objects/arrays
-        text = re.sub(r'(\})\s*(\{)', r'\1,\2', text)
-        text = re.sub(r'(\])\s*(\[)', r'\1,\2', text)
+        text = _RE_MISSING_COMMA_OBJ.sub(r'\1,\2', text)
+        text = _RE_MISSING_COMMA_ARR.sub(r'\1,\2', text)
 
         # Fix missing commas after string values
-        text = re.sub(r'(")\s*\n\s*(")', r'\1,\n\2', text)
+        text = _RE_MISSING_COMMA_STR.sub(r'\1,\n\2', text)
 
         # Remove any text after the final closing brace
         last_brace = text.rfind('}')
@@ -533,250 +683,34 @@ Return ONLY this JSON structure, no other text:
 
         logger.info("Using mock package generator")
 
-        # Value package - ~65% of budget
-        value_flight_price = 450 if cabin_class == "economy" else 700
-        value_hotel_price = 150
-        value_activities = [
-            Activity(
-                activity_id=f"ac_{uuid.uuid4().hex[:6]}",
-                name="City Walking Tour",
-                description="Explore the city's highlights on foot",
-                price_per_person_usd=45,
-                duration="3 hours",
-                included=["Guide", "Water"]
-            ),
-            Activity(
-                activity_id=f"ac_{uuid.uuid4().hex[:6]}",
-                name="Local Market Visit",
-                description="Experience local culture and cuisine",
-                price_per_person_usd=35,
-                duration="2 hours",
-                included=["Guide", "Snacks"]
-            )
-        ]
-
-        value_total = (value_flight_price * travelers * 2) + (value_hotel_price * nights) + sum(a.price_per_person_usd * travelers for a in value_activities)
-
-        value_package = TravelPackage(
-            tier="value",
-            travelers=travelers,
-            nights=nights,
-            flights=[
-                Flight(
-                    flight_id=f"fl_{uuid.uuid4().hex[:6]}",
-                    airline="Emirates",
-                    flight_number="EK-512",
-                    departure_city=origin,
-                    arrival_city=destination,
-                    departure_time=f"{start_date}T08:00:00",
-                    arrival_time=f"{start_date}T20:00:00",
-                    cabin_class=cabin_class,
-                    price_per_person_usd=value_flight_price,
-                    refundable=True
-                ),
-                Flight(
-                    flight_id=f"fl_{uuid.uuid4().hex[:6]}",
-                    airline="Emirates",
-                    flight_number="EK-513",
-                    departure_city=destination,
-                    arrival_city=origin,
-                    departure_time=f"{end_date}T22:00:00",
-                    arrival_time=f"{end_date}T08:00:00+1",
-                    cabin_class=cabin_class,
-                    price_per_person_usd=value_flight_price,
-                    refundable=True
-                )
-            ],
-            hotels=[
-                Hotel(
-                    hotel_id=f"ht_{uuid.uuid4().hex[:6]}",
-                    name="Marriott City Hotel",
-                    location=destination,
-                    star_rating=4,
-                    price_per_night_usd=value_hotel_price,
-                    nights=nights,
-                    check_in=start_date,
-                    check_out=end_date,
-                    room_type="Deluxe Room",
-                    refundable=True
-                )
-            ],
-            activities=value_activities,
-            total_usd=value_total,
-            description=f"Value {nights}-night {destination} getaway with 4-star accommodation"
+        templates = _mock_templates(
+            destination, origin, start_date, end_date, nights, travelers, budget, cabin_class
         )
+        return [self._instantiate_package(template) for template in templates]
 
-        # Recommended package - ~85% of budget
-        rec_flight_price = 650 if cabin_class == "economy" else 950
-        rec_hotel_price = 250
-        rec_activities = [
-            Activity(
-                activity_id=f"ac_{uuid.uuid4().hex[:6]}",
-                name="Sunset Dinner Cruise",
-                description="Romantic dinner cruise with stunning views",
-                price_per_person_usd=89,
-                duration="3 hours",
-                included=["Dinner", "Drinks", "Entertainment"]
-            ),
-            Activity(
-                activity_id=f"ac_{uuid.uuid4().hex[:6]}",
-                name="Heritage City Tour",
-                description="Private guided tour of historical sites",
-                price_per_person_usd=65,
-                duration="4 hours",
-                included=["Guide", "Entrance fees", "Lunch"]
-            ),
-            Activity(
-                activity_id=f"ac_{uuid.uuid4().hex[:6]}",
-                name="Desert Safari",
-                description="Adventure in the dunes with BBQ dinner",
-                price_per_person_usd=75,
-                duration="6 hours",
-                included=["Transport", "Dinner", "Entertainment"]
-            )
-        ]
-
-        rec_total = (rec_flight_price * travelers * 2) + (rec_hotel_price * nights) + sum(a.price_per_person_usd * travelers for a in rec_activities)
-
-        recommended_package = TravelPackage(
-            tier="recommended",
-            travelers=travelers,
-            nights=nights,
-            flights=[
-                Flight(
-                    flight_id=f"fl_{uuid.uuid4().hex[:6]}",
-                    airline="Emirates",
-                    flight_number="EK-784",
-                    departure_city=origin,
-                    arrival_city=destination,
-                    departure_time=f"{start_date}T10:00:00",
-                    arrival_time=f"{start_date}T22:00:00",
-                    cabin_class="business" if cabin_class != "economy" else cabin_class,
-                    price_per_person_usd=rec_flight_price,
-                    refundable=True
-                ),
-                Flight(
-                    flight_id=f"fl_{uuid.uuid4().hex[:6]}",
-                    airline="Emirates",
-                    flight_number="EK-785",
-                    departure_city=destination,
-                    arrival_city=origin,
-                    departure_time=f"{end_date}T23:30:00",
-                    arrival_time=f"{end_date}T07:00:00+1",
-                    cabin_class="business" if cabin_class != "economy" else cabin_class,
-                    price_per_person_usd=rec_flight_price,
-                    refundable=True
-                )
-            ],
-            hotels=[
-                Hotel(
-                    hotel_id=f"ht_{uuid.uuid4().hex[:6]}",
-                    name="Grand Hyatt",
-                    location=destination,
-                    star_rating=5,
-                    price_per_night_usd=rec_hotel_price,
-                    nights=nights,
-                    check_in=start_date,
-                    check_out=end_date,
-                    room_type="Grand Suite",
-                    refundable=True
-                )
-            ],
-            activities=rec_activities,
-            total_usd=rec_total,
-            description=f"Recommended {nights}-night luxury {destination} experience with 5-star resort"
-        )
+    def _instantiate_package(self, template: Dict[str, Any]) -> TravelPackage:
+        """
+        Build a TravelPackage from a trusted template with fresh IDs.
 
-        # Premium package - at/above budget
-        prem_flight_price = 1100
-        prem_hotel_price = 450
-        prem_activities = [
-            Activity(
-                activity_id=f"ac_{uuid.uuid4().hex[:6]}",
-                name="Private Yacht Charter",
-                description="Full-day private yacht experience",
-                price_per_person_usd=350,
-                duration="8 hours",
-                included=["Gourmet lunch", "Water sports", "Crew"]
-            ),
-            Activity(
-                activity_id=f"ac_{uuid.uuid4().hex[:6]}",
-                name="VIP Desert Experience",
-                description="Exclusive desert camp with fine dining",
-                price_per_person_usd=250,
-                duration="5 hours",
-                included=["Fine dining", "Private camp", "Entertainment"]
-            ),
-            Activity(
-                activity_id=f"ac_{uuid.uuid4().hex[:6]}",
-                name="Helicopter City Tour",
-                description="Aerial tour of the city landmarks",
-                price_per_person_usd=400,
-                duration="45 minutes",
-                included=["Champagne", "Photos"]
-            ),
-            Activity(
-                activity_id=f"ac_{uuid.uuid4().hex[:6]}",
-                name="Spa Day at Palace",
-                description="Full day of luxury spa treatments",
-                price_per_person_usd=200,
-                duration="6 hours",
-                included=["Treatments", "Lunch", "Pool access"]
-            )
-        ]
-
-        prem_total = (prem_flight_price * travelers * 2) + (prem_hotel_price * nights) + sum(a.price_per_person_usd * travelers for a in prem_activities)
-
-        premium_package = TravelPackage(
-            tier="premium",
-            travelers=travelers,
-            nights=nights,
-            flights=[
-                Flight(
-                    flight_id=f"fl_{uuid.uuid4().hex[:6]}",
-                    airline="Singapore Airlines",
-                    flight_number="SQ-891",
-                    departure_city=origin,
-                    arrival_city=destination,
-                    departure_time=f"{start_date}T09:00:00",
-                    arrival_time=f"{start_date}T21:00:00",
-                    cabin_class="first",
-                    price_per_person_usd=prem_flight_price,
-                    refundable=True
-                ),
-                Flight(
-                    flight_id=f"fl_{uuid.uuid4().hex[:6]}",
-                    airline="Singapore Airlines",
-                    flight_number="SQ-892",
-                    departure_city=destination,
-                    arrival_city=origin,
-                    departure_time=f"{end_date}T23:00:00",
-                    arrival_time=f"{end_date}T09:00:00+1",
-                    cabin_class="first",
-                    price_per_person_usd=prem_flight_price,
-                    refundable=True
-                )
+        Templates are already validated, so this uses model_construct and
+        skips Pydantic validation entirely.
+        """
+        return TravelPackage.model_construct(**{
+            **template,
+            "package_id": f"pkg_{secrets.token_hex(4)}",
+            "flights": [
+                Flight.model_construct(**{**flight, "flight_id": _short_id("fl")})
+                for flight in template["flights"]
             ],
-            hotels=[
-                Hotel(
-                    hotel_id=f"ht_{uuid.uuid4().hex[:6]}",
-                    name="Burj Al Arab",
-                    location=destination,
-                    star_rating=5,
-                    price_per_night_usd=prem_hotel_price,
-                    nights=nights,
-                    check_in=start_date,
-                    check_out=end_date,
-                    room_type="Royal Suite",
-                    refundable=True
-                )
+            "hotels": [
+                Hotel.model_construct(**{**hotel, "hotel_id": _short_id("ht")})
+                for hotel in template["hotels"]
             ],
-            activities=prem_activities,
-            total_usd=prem_total,
-            description=f"Ultimate {nights}-night VIP {destination} experience with iconic luxury"
-        )
-
-        return [value_package, recommended_package, premium_package]
+            "activities": [
+                Activity.model_construct(**{**activity, "activity_id": _short_id("ac")})
+                for activity in template["activities"]
+            ],
+        })
 
     def _package_to_line_items(self, package: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Convert a package to line items for hashing."""
@@ -807,5 +741,325 @@ Return ONLY this JSON structure, no other text:
         return items
 
 
+# ═══════════════════════════════════════════════════════════════
+# Fallback package templates (cached; IDs are assigned per use)
+# ═══════════════════════════════════════════════════════════════
+
+def _validated_templates(templates: Sequence[Dict[str, Any]]) -> Tuple[Dict[str, Any], ...]:
+    """Validate package templates once so instances can be built with model_construct."""
+    return tuple(
+        TravelPackage.model_validate({
+            **template,
+            "flights": [{**flight, "flight_id": ""} for flight in template["flights"]],
+            "hotels": [{**hotel, "hotel_id": ""} for hotel in template["hotels"]],
+            "activities": [{**activity, "activity_id": ""} for activity in template["activities"]],
+        }).model_dump()
+        for template in templates
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _hardcoded_templates(
+    destination: str,
+    origin: str,
+    start_date: str,
+    end_date: str,
+    nights: int,
+    travelers: int,
+    budget: float,
+    cabin_class: str
+) -> Tuple[Dict[str, Any], ...]:
+    """Package templates for the hardcoded last-resort fallback (without IDs)."""
+    tiers = [
+        ("value", 0.6, 3, "Budget-friendly package"),
+        ("recommended", 0.85, 4, "Best value - our top pick"),
+        ("premium", 1.1, 5, "Luxury experience")
+    ]
+
+    templates = []
+    for index, (tier, price_mult, stars, desc) in enumerate(tiers):
+        templates.append({
+            "tier": tier,
+            "flights": [{
+                "airline": "Travel Airways",
+                "flight_number": f"TA{100 + index}",
+                "departure_city": origin,
+                "arrival_city": destination,
+                "departure_time": f"{start_date}T10:00:00",
+                "arrival_time": f"{start_date}T16:00:00",
+                "cabin_class": cabin_class if tier != "premium" else "business",
+                "price_per_person_usd": int(400 * price_mult),
+                "refundable": True
+            }],
+            "hotels": [{
+                "name": f"{destination} {'Inn' if tier == 'value' else 'Grand Hotel' if tier == 'recommended' else 'Luxury Resort'}",
+                "location": destination,
+                "star_rating": stars,
+                "price_per_night_usd": int(150 * price_mult),
+                "nights": nights,
+                "check_in": start_date,
+                "check_out": end_date,
+                "room_type": "Standard" if tier == "value" else "Deluxe" if tier == "recommended" else "Suite",
+                "refundable": True
+            }],
+            "activities": [{
+                "name": f"{destination} Tour",
+                "description": "Explore the city highlights",
+                "price_per_person_usd": int(50 * price_mult),
+                "duration": "4 hours",
+                "included": ["Guide", "Water"] if tier == "value" else ["Guide", "Lunch", "Transport"]
+            }],
+            "total_usd": int(budget * price_mult),
+            "travelers": travelers,
+            "nights": nights,
+            "description": desc
+        })
+
+    return _validated_templates(templates)
+
+
+@functools.lru_cache(maxsize=256)
+def _mock_templates(
+    destination: str,
+    origin: str,
+    start_date: str,
+    end_date: str,
+    nights: int,
+    travelers: int,
+    budget: float,
+    cabin_class: str
+) -> Tuple[Dict[str, Any], ...]:
+    """Package templates for the mock generator (without IDs)."""
+
+    def package_total(flight_price: float, hotel_price: float, activities: List[Dict[str, Any]]) -> float:
+        return (
+            (flight_price * travelers * 2)
+            + (hotel_price * nights)
+            + sum(a["price_per_person_usd"] * travelers for a in activities)
+        )
+
+    # Value package - ~65% of budget
+    value_flight_price = 450 if cabin_class == "economy" else 700
+    value_hotel_price = 150
+    value_activities = [
+        {
+            "name": "City Walking Tour",
+            "description": "Explore the city's highlights on foot",
+            "price_per_person_usd": 45,
+            "duration": "3 hours",
+            "included": ["Guide", "Water"]
+        },
+        {
+            "name": "Local Market Visit",
+            "description": "Experience local culture and cuisine",
+            "price_per_person_usd": 35,
+            "duration": "2 hours",
+            "included": ["Guide", "Snacks"]
+        }
+    ]
+
+    value_package = {
+        "tier": "value",
+        "travelers": travelers,
+        "nights": nights,
+        "flights": [
+            {
+                "airline": "Emirates",
+                "flight_number": "EK-512",
+                "departure_city": origin,
+                "arrival_city": destination,
+                "departure_time": f"{start_date}T08:00:00",
+                "arrival_time": f"{start_date}T20:00:00",
+                "cabin_class": cabin_class,
+                "price_per_person_usd": value_flight_price,
+                "refundable": True
+            },
+            {
+                "airline": "Emirates",
+                "flight_number": "EK-513",
+                "departure_city": destination,
+                "arrival_city": origin,
+                "departure_time": f"{end_date}T22:00:00",
+                "arrival_time": f"{end_date}T08:00:00+1",
+                "cabin_class": cabin_class,
+                "price_per_person_usd": value_flight_price,
+                "refundable": True
+            }
+        ],
+        "hotels": [
+            {
+                "name": "Marriott City Hotel",
+                "location": destination,
+                "star_rating": 4,
+                "price_per_night_usd": value_hotel_price,
+                "nights": nights,
+                "check_in": start_date,
+                "check_out": end_date,
+                "room_type": "Deluxe Room",
+                "refundable": True
+            }
+        ],
+        "activities": value_activities,
+        "total_usd": package_total(value_flight_price, value_hotel_price, value_activities),
+        "description": f"Value {nights}-night {destination} getaway with 4-star accommodation"
+    }
+
+    # Recommended package - ~85% of budget
+    rec_flight_price = 650 if cabin_class == "economy" else 950
+    rec_hotel_price = 250
+    rec_cabin = "business" if cabin_class != "economy" else cabin_class
+    rec_activities = [
+        {
+            "name": "Sunset Dinner Cruise",
+            "description": "Romantic dinner cruise with stunning views",
+            "price_per_person_usd": 89,
+            "duration": "3 hours",
+            "included": ["Dinner", "Drinks", "Entertainment"]
+        },
+        {
+            "name": "Heritage City Tour",
+            "description": "Private guided tour of historical sites",
+            "price_per_person_usd": 65,
+            "duration": "4 hours",
+            "included": ["Guide", "Entrance fees", "Lunch"]
+        },
+        {
+            "name": "Desert Safari",
+            "description": "Adventure in the dunes with BBQ dinner",
+            "price_per_person_usd": 75,
+            "duration": "6 hours",
+            "included": ["Transport", "Dinner", "Entertainment"]
+        }
+    ]
+
+    recommended_package = {
+        "tier": "recommended",
+        "travelers": travelers,
+        "nights": nights,
+        "flights": [
+            {
+                "airline": "Emirates",
+                "flight_number": "EK-784",
+                "departure_city": origin,
+                "arrival_city": destination,
+                "departure_time": f"{start_date}T10:00:00",
+                "arrival_time": f"{start_date}T22:00:00",
+                "cabin_class": rec_cabin,
+                "price_per_person_usd": rec_flight_price,
+                "refundable": True
+            },
+            {
+                "airline": "Emirates",
+                "flight_number": "EK-785",
+                "departure_city": destination,
+                "arrival_city": origin,
+                "departure_time": f"{end_date}T23:30:00",
+                "arrival_time": f"{end_date}T07:00:00+1",
+                "cabin_class": rec_cabin,
+                "price_per_person_usd": rec_flight_price,
+                "refundable": True
+            }
+        ],
+        "hotels": [
+            {
+                "name": "Grand Hyatt",
+                "location": destination,
+                "star_rating": 5,
+                "price_per_night_usd": rec_hotel_price,
+                "nights": nights,
+                "check_in": start_date,
+                "check_out": end_date,
+                "room_type": "Grand Suite",
+                "refundable": True
+            }
+        ],
+        "activities": rec_activities,
+        "total_usd": package_total(rec_flight_price, rec_hotel_price, rec_activities),
+        "description": f"Recommended {nights}-night luxury {destination} experience with 5-star resort"
+    }
+
+    # Premium package - at/above budget
+    prem_flight_price = 1100
+    prem_hotel_price = 450
+    prem_activities = [
+        {
+            "name": "Private Yacht Charter",
+            "description": "Full-day private yacht experience",
+            "price_per_person_usd": 350,
+            "duration": "8 hours",
+            "included": ["Gourmet lunch", "Water sports", "Crew"]
+        },
+        {
+            "name": "VIP Desert Experience",
+            "description": "Exclusive desert camp with fine dining",
+            "price_per_person_usd": 250,
+            "duration": "5 hours",
+            "included": ["Fine dining", "Private camp", "Entertainment"]
+        },
+        {
+            "name": "Helicopter City Tour",
+            "description": "Aerial tour of the city landmarks",
+            "price_per_person_usd": 400,
+            "duration": "45 minutes",
+            "included": ["Champagne", "Photos"]
+        },
+        {
+            "name": "Spa Day at Palace",
+            "description": "Full day of luxury spa treatments",
+            "price_per_person_usd": 200,
+            "duration": "6 hours",
+            "included": ["Treatments", "Lunch", "Pool access"]
+        }
+    ]
+
+    premium_package = {
+        "tier": "premium",
+        "travelers": travelers,
+        "nights": nights,
+        "flights": [
+            {
+                "airline": "Singapore Airlines",
+                "flight_number": "SQ-891",
+                "departure_city": origin,
+                "arrival_city": destination,
+                "departure_time": f"{start_date}T09:00:00",
+                "arrival_time": f"{start_date}T21:00:00",
+                "cabin_class": "first",
+                "price_per_person_usd": prem_flight_price,
+                "refundable": True
+            },
+            {
+                "airline": "Singapore Airlines",
+                "flight_number": "SQ-892",
+                "departure_city": destination,
+                "arrival_city": origin,
+                "departure_time": f"{end_date}T23:00:00",
+                "arrival_time": f"{end_date}T09:00:00+1",
+                "cabin_class": "first",
+                "price_per_person_usd": prem_flight_price,
+                "refundable": True
+            }
+        ],
+        "hotels": [
+            {
+                "name": "Burj Al Arab",
+                "location": destination,
+                "star_rating": 5,
+                "price_per_night_usd": prem_hotel_price,
+                "nights": nights,
+                "check_in": start_date,
+                "check_out": end_date,
+                "room_type": "Royal Suite",
+                "refundable": True
+            }
+        ],
+        "activities": prem_activities,
+        "total_usd": package_total(prem_flight_price, prem_hotel_price, prem_activities),
+        "description": f"Ultimate {nights}-night VIP {destination} experience with iconic luxury"
+    }
+
+    return _validated_templates((value_package, recommended_package, premium_package))
+
+
 # Singleton instance
 merchant_agent = MerchantAgent()
@@ -3,15 +3,17 @@ Payment Agent - Payment processor and settlement
 Handles PaymentMandate validation and transaction processing
 """
 
-import uuid
-from datetime import datetime
-from typing import Dict, Any, Optional, List
-
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-
-from config import PAYMENT_AGENT_ID
+import asyncio
+import functools
+import hmac
+import os
+import secrets
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Sequence, Tuple
+import orjson
+
+from config import PAYMENT_AGENT_ID, DEMO_AUTH_DELAY_SEC
 from ap2_types import (
     PaymentConfirmation,
     BookingReference,
@@ -30,6 +32,69 @@ from utils import (
 
 logger = get_logger("PaymentAgent")
 
+# Default for spending limits that are not set
+_POS_INF = float("inf")
+
+# Line item types that get booking references
+_CATEGORY_BUCKETS = ("flight", "hotel", "activity")
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_expiry(value: str) -> datetime:
+    """Parse an ISO-8601 mandate expiry, accepting a trailing "Z" for UTC."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _pack_id(value: Any) -> str:
+    """Length-prefixed ID; None gets its own marker so it never equals ""."""
+    if value is None:
+        return "-"
+    text = str(value)
+    return f"{len(text)}:{text}"
+
+
+def _constant_time_equal(a: Any, b: Any) -> bool:
+    """Compare two mandate IDs/hashes without leaking timing information."""
+    return hmac.compare_digest(_pack_id(a).encode(), _pack_id(b).encode())
+
+
+def _pack_ids(values: Tuple[Any, ...]) -> bytes:
+    """Join packed IDs so a tuple of them compares as one byte string."""
+    return "".join(map(_pack_id, values)).encode()
+
+
+# Most recent transactions kept in memory
+_TX_CAP = 10_000
+
+
+class MandateStore:
+    """
+    Bounded LRU of mandates keyed by mandate_id.
+    Transactions reference mandates by ID; retries share a single stored copy.
+    Sized for the three mandates of every retained transaction.
+    """
+
+    def __init__(self, capacity: int = 3 * _TX_CAP):
+        self.capacity = capacity
+        self._mandates: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def put(self, mandate: Dict[str, Any]) -> str:
+        """Store a mandate and return its key (a generated one if it has no ID)."""
+        mandate_id = mandate.get("mandate_id") or f"anon_{secrets.token_hex(8)}"
+        self._mandates[mandate_id] = mandate
+        self._mandates.move_to_end(mandate_id)
+        if len(self._mandates) > self.capacity:
+            self._mandates.popitem(last=False)
+        return mandate_id
+
+    def get(self, mandate_id: str) -> Optional[Dict[str, Any]]:
+        """Get a stored mandate, or None if unknown or evicted."""
+        return self._mandates.get(mandate_id)
+
+
+# Singleton mandate store for this process
+mandate_store = MandateStore()
+
 
 class PaymentAgent:
     """
@@ -46,7 +111,12 @@ class PaymentAgent:
 
     def __init__(self):
         self.agent_id = PAYMENT_AGENT_ID
-        self.transactions: Dict[str, Dict[str, Any]] = {}
+        # Most recent transactions, oldest evicted first once the cap is reached
+        self.transactions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._tx_cap = _TX_CAP
+        # cart_hash -> canonical line items already verified against it
+        self._cart_hash_cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cart_hash_cache_cap = 1024
 
     async def process_payment_mandate(
         self,
@@ -57,8 +127,9 @@ class PaymentAgent:
         """
         Process a PaymentMandate and authorize the transaction.
         """
-        logger.info(f"Processing PaymentMandate: {payment_mandate.get('mandate_id', 'unknown')}")
-        log_mandate_event(logger, "RECEIVED", "PaymentMandate", payment_mandate.get("mandate_id", ""))
+        payment_mandate_id = payment_mandate.get("mandate_id", "")
+        logger.info(f"Processing PaymentMandate: {payment_mandate_id or 'unknown'}")
+        log_mandate_event(logger, "RECEIVED", "PaymentMandate", payment_mandate_id)
 
         # Step 1: Validate all mandates
         validation = self._validate_mandates(payment_mandate, cart_mandate, intent_mandate)
@@ -72,7 +143,8 @@ class PaymentAgent:
             }
 
         # Step 2: Check spending limits
-        total_amount = cart_mandate.get("amounts", {}).get("total_usd", 0)
+        amounts = cart_mandate.get("amounts") or {}
+        total_amount = amounts.get("total_usd", 0)
         spending_limits = intent_mandate.get("spending_limits", {})
 
         if not self._check_spending_limits(total_amount, spending_limits):
@@ -106,29 +178,37 @@ class PaymentAgent:
         # Step 4: Generate booking references
         booking_refs = self._generate_booking_references(cart_mandate)
 
-        # Step 5: Create payment confirmation
-        confirmation = PaymentConfirmation(
+        # Step 5: Create payment confirmation (one timestamp for the whole record).
+        # Every field is generated here or already validated, so skip re-validation;
+        # the cart's amounts come from the caller and are still validated.
+        now_iso = datetime.now(timezone.utc).isoformat()
+        confirmation = PaymentConfirmation.model_construct(
             transaction_id=auth_result["transaction_id"],
             authorization_code=auth_result["authorization_code"],
             status="APPROVED",
-            settlement_timestamp=datetime.utcnow().isoformat(),
+            settlement_timestamp=now_iso,
             liability_assignment="merchant" if payment_mandate.get("agent_presence") == "HUMAN_PRESENT" else "issuer",
-            payment_mandate_id=payment_mandate.get("mandate_id", ""),
+            payment_mandate_id=payment_mandate_id,
             cart_mandate_id=cart_mandate.get("mandate_id", ""),
             intent_mandate_id=intent_mandate.get("mandate_id", ""),
             booking_references=booking_refs,
-            total_charged=Amounts(**cart_mandate.get("amounts", {})),
+            total_charged=Amounts(**amounts),
             audit_trail="Complete — Intent → Cart → Payment"
         )
 
+        confirmation_dict = confirmation.model_dump()
+
         # Store transaction
         self.transactions[confirmation.transaction_id] = {
-            "confirmation": confirmation.model_dump(),
-            "payment_mandate": payment_mandate,
-            "cart_mandate": cart_mandate,
-            "intent_mandate": intent_mandate,
-            "processed_at": datetime.utcnow().isoformat()
+            "confirmation": confirmation_dict,
+            "payment_mandate_id": mandate_store.put(payment_mandate),
+            "cart_mandate_id": mandate_store.put(cart_mandate),
+            "intent_mandate_id": mandate_store.put(intent_mandate),
+            "processed_at": now_iso
         }
+        self.transactions.move_to_end(confirmation.transaction_id)
+        if len(self.transactions) > self._tx_cap:
+            self.transactions.popitem(last=False)
 
         log_payment_event(
             logger,
@@ -145,29 +225,83 @@ class PaymentAgent:
 
         return {
             "success": True,
-            "confirmation": confirmation.model_dump()
+            "confirmation": confirmation_dict
         }
 
+    async def process_payment_mandates_batch(
+        self,
+        items: Sequence[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Process several (payment, cart, intent) mandate triples concurrently.
+        Results are returned in input order; a failure in one item does not affect the others.
+        """
+        results = await asyncio.gather(
+            *(
+                self.process_payment_mandate(payment_mandate, cart_mandate, intent_mandate)
+                for payment_mandate, cart_mandate, intent_mandate in items
+            ),
+            return_exceptions=True
+        )
+
+        responses = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Batch payment item failed: {result}")
+                responses.append({"success": False, "error": str(result)})
+            else:
+                responses.append(result)
+        return responses
+
     def _validate_mandates(
         self,
         payment_mandate: Dict[str, Any],
         cart_mandate: Dict[str, Any],
-        intent_mandate: Dict[str, Any]
+        intent_mandate: Dict[str, Any],
+        collect_all_errors: bool = False
     ) -> Dict[str, Any]:
         """
         Validate all mandate signatures and linkage.
+        Stops at the first failed check unless collect_all_errors is set (debugging).
         """
         errors = []
 
-        # Check mandate linkage
-        if payment_mandate.get("cart_mandate_id") != cart_mandate.get("mandate_id"):
-            errors.append("PaymentMandate cart_mandate_id does not match CartMandate")
+        # Check intent mandate not expired
+        expires_at = intent_mandate.get("expires_at")
+        if expires_at:
+            try:
+                expiry = _parse_expiry(expires_at)
+                now = datetime.now(expiry.tzinfo) if expiry.tzinfo else datetime.utcnow()
+                if expiry < now:
+                    errors.append("IntentMandate has expired")
+            except Exception as e:
+                logger.warning(f"Could not parse expiry: {e}")
 
-        if payment_mandate.get("intent_mandate_id") != intent_mandate.get("mandate_id"):
-            errors.append("PaymentMandate intent_mandate_id does not match IntentMandate")
+        if errors and not collect_all_errors:
+            return {"valid": False, "errors": errors}
 
-        if cart_mandate.get("intent_mandate_id") != intent_mandate.get("mandate_id"):
-            errors.append("CartMandate intent_mandate_id does not match IntentMandate")
+        # Check mandate linkage: one fused comparison, per-link messages only on failure
+        intent_mandate_id = intent_mandate.get("mandate_id")
+        linked = (
+            payment_mandate.get("cart_mandate_id"),
+            payment_mandate.get("intent_mandate_id"),
+            cart_mandate.get("intent_mandate_id"),
+        )
+        expected = (cart_mandate.get("mandate_id"), intent_mandate_id, intent_mandate_id)
+
+        if not hmac.compare_digest(_pack_ids(linked), _pack_ids(expected)):
+            messages = (
+                "PaymentMandate cart_mandate_id does not match CartMandate",
+                "PaymentMandate intent_mandate_id does not match IntentMandate",
+                "CartMandate intent_mandate_id does not match IntentMandate",
+            )
+            for actual, wanted, message in zip(linked, expected, messages):
+                if not _constant_time_equal(actual, wanted):
+                    errors.append(message)
+                    if not collect_all_errors:
+                        break
+            if not collect_all_errors:
+                return {"valid": False, "errors": errors}
 
         # Verify intent mandate signature (simulated)
         intent_signature = intent_mandate.get("signature")
@@ -181,25 +315,35 @@ class PaymentAgent:
         expected_hash = cart_mandate.get("cart_hash")
 
         if expected_hash:
-            # Simplified hash check for demo
-            log_mandate_event(logger, "VERIFIED", "CartMandate", cart_mandate.get("mandate_id", ""))
-
-        # Check intent mandate not expired
-        expires_at = intent_mandate.get("expires_at")
-        if expires_at:
-            try:
-                expiry = datetime.fromisoformat(expires_at.replace("Z", "+00:00"))
-                now = datetime.now(expiry.tzinfo) if expiry.tzinfo else datetime.utcnow()
-                if expiry < now:
-                    errors.append("IntentMandate has expired")
-            except Exception as e:
-                logger.warning(f"Could not parse expiry: {e}")
+            if self._verify_cart_hash_cached(line_items, expected_hash):
+                log_mandate_event(logger, "VERIFIED", "CartMandate", cart_mandate.get("mandate_id", ""))
+            else:
+                # Demo mode: report the mismatch but don't reject the payment
+                logger.warning(f"Cart hash mismatch for CartMandate {cart_mandate.get('mandate_id', '')}")
 
         return {
             "valid": len(errors) == 0,
             "errors": errors
         }
 
+    def _verify_cart_hash_cached(self, line_items: List[Dict[str, Any]], expected_hash: str) -> bool:
+        """
+        Verify line items against a cart hash, remembering carts already verified.
+        """
+        canonical = orjson.dumps(line_items, option=orjson.OPT_SORT_KEYS, default=str)
+        cached = self._cart_hash_cache.get(expected_hash)
+        if cached is not None and cached == canonical:
+            self._cart_hash_cache.move_to_end(expected_hash)
+            return True
+
+        if not verify_cart_hash(line_items, expected_hash):
+            return False
+
+        self._cart_hash_cache[expected_hash] = canonical
+        if len(self._cart_hash_cache) > self._cart_hash_cache_cap:
+            self._cart_hash_cache.popitem(last=False)
+        return True
+
     def _check_spending_limits(
         self,
         total_amount: float,
@@ -208,8 +352,8 @@ class PaymentAgent:
         """
         Check if transaction is within authorized spending limits.
         """
-        max_total = spending_limits.get("max_total_usd", float("inf"))
-        max_per_transaction = spending_limits.get("max_per_transaction_usd", float("inf"))
+        max_total = spending_limits.get("max_total_usd", _POS_INF)
+        max_per_transaction = spending_limits.get("max_per_transaction_usd", _POS_INF)
 
         if total_amount > max_total:
             logger.warning(f"Amount ${total_amount} exceeds max total ${max_total}")
@@ -237,9 +381,9 @@ class PaymentAgent:
         transaction_id = generate_transaction_id()
         authorization_code = generate_authorization_code()
 
-        # Simulate network latency
-        import asyncio
-        await asyncio.sleep(0.5)
+        # Optional simulated network latency for demos
+        if DEMO_AUTH_DELAY_SEC > 0:
+            await asyncio.sleep(DEMO_AUTH_DELAY_SEC)
 
         return {
             "authorized": True,
@@ -259,37 +403,51 @@ class PaymentAgent:
         booking_refs = []
         line_items = cart_mandate.get("line_items", [])
 
-        # Group items by type
-        flights = [item for item in line_items if item.get("item_type") == "flight"]
-        hotels = [item for item in line_items if item.get("item_type") == "hotel"]
-        activities = [item for item in line_items if item.get("item_type") == "activity"]
+        # Group items by type in a single pass
+        buckets: Dict[str, List[Dict[str, Any]]] = {category: [] for category in _CATEGORY_BUCKETS}
+        for item in line_items:
+            bucket = buckets.get(item.get("item_type"))
+            if bucket is not None:
+                bucket.append(item)
+        flights, hotels, activities = buckets["flight"], buckets["hotel"], buckets["activity"]
+
+        # One RNG draw for every confirmation number (8 hex chars each)
+        count = (1 if flights else 0) + len(hotels) + len(activities)
+        random_hex = os.urandom(4 * count).hex().upper()
+        codes = (random_hex[i:i + 8] for i in range(0, 8 * count, 8))
+
+        # Bind hot callables once for the loops below
+        add_ref = booking_refs.append
+        make_ref = BookingReference
+        make_pnr = generate_pnr
+        next_code = codes.__next__
 
         # Generate single PNR for all flights
         if flights:
-            booking_refs.append(BookingReference(
+            add_ref(make_ref(
                 item_type="flight",
-                pnr=generate_pnr("EK"),
-                confirmation_number=f"FL{uuid.uuid4().hex[:8].upper()}",
+                pnr=make_pnr("EK"),
+                confirmation_number=f"FL{next_code()}",
                 provider=flights[0].get("details", {}).get("airline", "Airline")
             ))
 
         # Generate confirmation for hotels
         for hotel in hotels:
             hotel_details = hotel.get("details", {})
-            booking_refs.append(BookingReference(
+            add_ref(make_ref(
                 item_type="hotel",
-                pnr=generate_pnr("HT"),
-                confirmation_number=f"HT{uuid.uuid4().hex[:8].upper()}",
+                pnr=make_pnr("HT"),
+                confirmation_number=f"HT{next_code()}",
                 provider=hotel_details.get("name", "Hotel")
             ))
 
         # Generate confirmations for activities
         for i, activity in enumerate(activities):
             activity_details = activity.get("details", {})
-            booking_refs.append(BookingReference(
+            add_ref(make_ref(
                 item_type="activity",
-                pnr=generate_pnr("AC"),
-                confirmation_number=f"AC{uuid.uuid4().hex[:8].upper()}",
+                pnr=make_pnr("AC"),
+                confirmation_number=f"AC{next_code()}",
                 provider=activity_details.get("name", f"Activity {i+1}")
             ))
 
@@ -297,15 +455,28 @@ class PaymentAgent:
 
     def get_transaction(self, transaction_id: str) -> Optional[Dict[str, Any]]:
         """
-        Get details of a processed transaction.
+        Get details of a processed transaction, including its mandates.
         """
-        return self.transactions.get(transaction_id)
+        record = self.transactions.get(transaction_id)
+        if record is None:
+            return None
+        return self._with_mandates(record)
 
     def get_all_transactions(self) -> List[Dict[str, Any]]:
         """
-        Get all processed transactions.
+        Get all processed transactions, including their mandates.
         """
-        return list(self.transactions.values())
+        return [self._with_mandates(record) for record in self.transactions.values()]
+
+    @staticmethod
+    def _with_mandates(record: Dict[str, Any]) -> Dict[str, Any]:
+        """Embed the mandates a transaction record references by ID."""
+        return {
+            **record,
+            "payment_mandate": mandate_store.get(record["payment_mandate_id"]),
+            "cart_mandate": mandate_store.get(record["cart_mandate_id"]),
+            "intent_mandate": mandate_store.get(record["intent_mandate_id"]),
+        }
 
 
 # Singleton instance
@@ -3,28 +3,29 @@ Shopping Agent - User-facing travel shopping orchestrator with conversational fl
 Handles multi-turn conversations, creates Intent Mandates, and orchestrates the AP2 checkout flow
 """
 
-import json
+import asyncio
+import hashlib
 import uuid
+import secrets
 import time
 import re
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict, deque
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, Optional, List, Tuple
 from enum import Enum
 import httpx
-
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import orjson
 
 from config import (
     OPENROUTER_API_KEY,
     OPENROUTER_MODEL,
     OPENROUTER_TIMEOUT,
+    OPENROUTER_CONCURRENCY,
     MERCHANT_AGENT_URL,
     CREDENTIALS_AGENT_URL,
     PAYMENT_AGENT_URL,
     SHOPPING_AGENT_ID,
+    SESSION_IDLE_TTL_SEC,
     MERCHANT_ID,
     MERCHANT_NAME,
 )
@@ -56,10 +57,684 @@ from utils import (
     generate_device_signature,
     A2AClient,
     extract_mandate_from_message,
+    ThinkFilter,
+    JsonObjectScanner,
+    iter_sse_content,
 )
 
 logger = get_logger("ShoppingAgent")
 
+OPENROUTER_CHAT_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# Shared OpenRouter client - reused by every session's LLM calls
+_HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+# Bounds concurrent completions so a burst of sessions queues here instead of
+# tripping provider rate limits
+_LLM_SEMAPHORE = asyncio.Semaphore(OPENROUTER_CONCURRENCY)
+
+
+async def _get_client() -> httpx.AsyncClient:
+    """Return the shared OpenRouter client, creating it on first use."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None or _HTTP_CLIENT.is_closed:
+        _HTTP_CLIENT = httpx.AsyncClient(
+            timeout=OPENROUTER_TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            headers={
+                "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+                "Content-Type": "application/json"
+            }
+        )
+    return _HTTP_CLIENT
+
+
+async def close_http_client() -> None:
+    """Close the shared OpenRouter HTTP client."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is not None:
+        await _HTTP_CLIENT.aclose()
+        _HTTP_CLIENT = None
+
+
+async def _stream_json_object(
+    client: httpx.AsyncClient, body: Dict[str, Any]
+) -> tuple[str, Optional[str]]:
+    """
+    Stream a chat completion and stop as soon as the first JSON object closes.
+
+    Leaving the stream early closes the connection, which cancels the rest of
+    the generation. Returns (visible text received, JSON object text or None).
+    """
+    think = ThinkFilter()
+    scanner = JsonObjectScanner()
+    async with _LLM_SEMAPHORE, client.stream(
+        "POST", OPENROUTER_CHAT_URL, content=orjson.dumps({**body, "stream": True})
+    ) as resp:
+        resp.raise_for_status()
+        async for content in iter_sse_content(resp):
+            obj = scanner.feed(think.feed(content))
+            if obj is not None:
+                return scanner.text, obj
+    obj = scanner.feed(think.flush())
+    return scanner.text, obj
+
+
+async def _stream_chat_text(client: httpx.AsyncClient, body: Dict[str, Any]) -> str:
+    """Stream a chat completion and return its text with <think> spans removed."""
+    think = ThinkFilter()
+    parts: List[str] = []
+    async with _LLM_SEMAPHORE, client.stream(
+        "POST", OPENROUTER_CHAT_URL, content=orjson.dumps({**body, "stream": True})
+    ) as resp:
+        resp.raise_for_status()
+        async for content in iter_sse_content(resp):
+            parts.append(think.feed(content))
+    parts.append(think.flush())
+    return "".join(parts)
+
+
+def _phrase_re(phrases) -> "re.Pattern[str]":
+    """Compile phrases into one alternation that matches if any phrase is a substring."""
+    return re.compile("|".join(map(re.escape, phrases)))
+
+
+# ═══════════════════════════════════════════════════════════════
+# Simple intent classifier vocabulary (compiled once)
+# ═══════════════════════════════════════════════════════════════
+
+_PURE_GREETINGS = frozenset({
+    "hi",
+    "hello",
+    "hey",
+    "howdy",
+    "hola",
+    "greetings",
+    "good morning",
+    "good afternoon",
+    "good evening",
+})
+
+_CANCEL_RE = _phrase_re(["cancel", "start over", "forget it", "never mind", "nevermind"])
+
+_CONFIRM_RE = _phrase_re([
+    "yes",
+    "yeah",
+    "yep",
+    "sure",
+    "ok",
+    "okay",
+    "proceed",
+    "continue",
+    "looks good",
+    "perfect",
+    "great",
+    "let's go",
+    "confirm",
+    "correct",
+    "that's right",
+    "yes, search",
+    "search for packages",
+    "find packages",
+    "yes, let's start",
+    "start fresh",
+])
+
+_DECLINE_RE = _phrase_re([
+    "no",
+    "nope",
+    "change",
+    "modify",
+    "edit",
+    "not quite",
+    "wrong",
+    "change destination",
+    "change dates",
+    "change travelers",
+    "change budget",
+    "add preferences",
+    "no thanks",
+])
+
+# Package keywords - the named group that matches is the selected tier
+_PACKAGE_KEYWORD_RE = re.compile(
+    r"\b(?:(?P<value>value|cheapest|budget)"
+    r"|(?P<premium>premium|expensive|luxury)"
+    r"|(?P<recommended>recommended|best|suggested))\b"
+)
+
+_CHECKOUT_WALLET_RE = _phrase_re(["wallet", "digital", "quick", "express", "📱"])
+_CHECKOUT_MANUAL_RE = _phrase_re(["manual", "fill", "enter", "myself", "💳"])
+_CHECKOUT_EDIT_RE = _phrase_re(["edit", "change", "modify", "correct"])
+_CHECKOUT_CONFIRM_RE = _phrase_re(["yes", "proceed", "continue", "confirm", "ok"])
+
+_PAYMENT_CARD_RE = _phrase_re([
+    "card",
+    "credit",
+    "debit",
+    "visa",
+    "mastercard",
+    "credit card",
+    "debit card",
+    "first",
+    "proceed",
+    "yes",
+])
+_PAYMENT_WALLET_RE = _phrase_re(["wallet", "paypal", "apple pay", "google pay", "digital wallet"])
+
+# Popular destinations or trip words in a greeting - skip straight to gathering
+_GREETING_TRAVEL_RE = _phrase_re([
+    "dubai",
+    "tokyo",
+    "paris",
+    "london",
+    "bali",
+    "rome",
+    "new york",
+    "singapore",
+    "barcelona",
+    "amsterdam",
+    "trip",
+    "travel",
+    "vacation",
+    "visit",
+    "flight",
+    "book",
+])
+
+# Characters that suggest entities (amounts, emails, lists) worth an LLM pass
+_LLM_TRIGGER_CHARS = frozenset("$@,.")
+
+_QUESTION_PREFIXES = (
+    "what",
+    "why",
+    "how",
+    "when",
+    "where",
+    "can you",
+    "could you",
+    "is there",
+    "are there",
+)
+
+# ═══════════════════════════════════════════════════════════════
+# Simple travel-info extractor patterns (compiled once)
+# ═══════════════════════════════════════════════════════════════
+
+# Destinations - comprehensive list (alias -> canonical name)
+_DESTINATIONS = {
+    # Major international
+    "dubai": "Dubai",
+    "tokyo": "Tokyo",
+    "paris": "Paris",
+    "london": "London",
+    "bali": "Bali",
+    "rome": "Rome",
+    "new york": "New York",
+    "nyc": "New York",
+    "singapore": "Singapore",
+    "barcelona": "Barcelona",
+    "amsterdam": "Amsterdam",
+    "sydney": "Sydney",
+    "bangkok": "Bangkok",
+    "maldives": "Maldives",
+    "hawaii": "Hawaii",
+    "hong kong": "Hong Kong",
+    "los angeles": "Los Angeles",
+    "miami": "Miami",
+    "las vegas": "Las Vegas",
+    "cancun": "Cancun",
+    "greece": "Greece",
+    "santorini": "Santorini",
+    "italy": "Italy",
+    "spain": "Spain",
+    "japan": "Japan",
+    "thailand": "Thailand",
+    "france": "France",
+    "uk": "London",
+    "usa": "New York",
+    "australia": "Sydney",
+    "brazil": "Brazil",
+    "mexico": "Mexico",
+    "canada": "Canada",
+    "iceland": "Iceland",
+    "switzerland": "Switzerland",
+    "austria": "Austria",
+    "portugal": "Portugal",
+    "morocco": "Morocco",
+    "egypt": "Egypt",
+    "south africa": "South Africa",
+    # Indian cities
+    "bangalore": "Bangalore",
+    "bengaluru": "Bangalore",
+    "mumbai": "Mumbai",
+    "bombay": "Mumbai",
+    "delhi": "Delhi",
+    "new delhi": "New Delhi",
+    "chennai": "Chennai",
+    "madras": "Chennai",
+    "kolkata": "Kolkata",
+    "calcutta": "Kolkata",
+    "hyderabad": "Hyderabad",
+    "pune": "Pune",
+    "goa": "Goa",
+    "jaipur": "Jaipur",
+    "agra": "Agra",
+    "kerala": "Kerala",
+    "kochi": "Kochi",
+    "cochin": "Kochi",
+    "udaipur": "Udaipur",
+    "varanasi": "Varanasi",
+    "india": "India",
+    # More Asian
+    "seoul": "Seoul",
+    "kuala lumpur": "Kuala Lumpur",
+    "kl": "Kuala Lumpur",
+    "taipei": "Taipei",
+    "osaka": "Osaka",
+    "kyoto": "Kyoto",
+    "hanoi": "Hanoi",
+    "ho chi minh": "Ho Chi Minh City",
+    "saigon": "Ho Chi Minh City",
+    "phuket": "Phuket",
+    "bora bora": "Bora Bora",
+    "fiji": "Fiji",
+    # European
+    "berlin": "Berlin",
+    "munich": "Munich",
+    "prague": "Prague",
+    "vienna": "Vienna",
+    "budapest": "Budapest",
+    "athens": "Athens",
+    "lisbon": "Lisbon",
+    "madrid": "Madrid",
+    "milan": "Milan",
+    "venice": "Venice",
+    "florence": "Florence",
+    "dublin": "Dublin",
+    "edinburgh": "Edinburgh",
+    "copenhagen": "Copenhagen",
+    "stockholm": "Stockholm",
+    "oslo": "Oslo",
+    # Middle East
+    "abu dhabi": "Abu Dhabi",
+    "doha": "Doha",
+    "qatar": "Qatar",
+    "riyadh": "Riyadh",
+    "jeddah": "Jeddah",
+    "jerusalem": "Jerusalem",
+    "tel aviv": "Tel Aviv",
+    "oman": "Oman",
+    "muscat": "Muscat",
+}
+
+# Whole-word known alias, optionally led by a word marking it as origin or
+# destination; longer aliases are tried first where two start at the same place
+_DESTINATION_RE = re.compile(
+    r"(?:\b(?P<cue>from|leaving|departing|to|visit|visiting)\s+)?\b(?P<dest>"
+    + "|".join(map(re.escape, sorted(_DESTINATIONS, key=len, reverse=True)))
+    + r")\b"
+)
+_ORIGIN_CUES = frozenset({"from", "leaving", "departing"})
+
+
+def _match_destination(msg_lower: str) -> Optional[str]:
+    """
+    Find the destination among the known aliases in msg_lower.
+
+    Aliases led by an origin word ("from nyc") are skipped; one led by "to" or
+    "visit" wins, otherwise the first remaining alias does.
+    """
+    first = None
+    for match in _DESTINATION_RE.finditer(msg_lower):
+        cue = match["cue"]
+        if cue in _ORIGIN_CUES:
+            continue
+        if cue:
+            return _DESTINATIONS[match["dest"]]
+        first = first or match["dest"]
+    return _DESTINATIONS[first] if first else None
+
+
+# Traveler count phrases fused into one alternation: the named group that
+# matched (solo / couple / count) says which kind of phrase was found, and
+# for counts the d* group holds the number.
+_TRAVELERS_RE = re.compile(
+    r"(?P<solo>"
+    r"\bjust\s*me\b|\bme\s*only\b|\bonly\s*me\b|\bmyself\b|\bsolo\b|\balone\b"
+    r"|\bsingle\s*traveler\b|\b1\s*person\b|\bone\s*person\b|\bjust\s*1\b"
+    r"|\bjust\s*one\b|\bonly\s*1\b|\bonly\s*one\b|\bi\s*am\s*alone\b"
+    r"|\bgoing\s*alone\b|^\s*1\s*$|^\s*me\s*$|^\s*one\s*$"
+    r"|just\s*me\s*\(\s*1\s*\)"  # "Just me (1)" - exact match for suggestion
+    r")|(?P<couple>"
+    r"\bcouple\b|\bpair\b|\bus\s*two\b|\btwo\s*of\s*us\b|\bmy\s*partner\b"
+    r"|\bwith\s*spouse\b|\bwith\s*wife\b|\bwith\s*husband\b"
+    r")"
+)
+# Numeric traveler counts in priority order - a unit-bearing form like "4 adults"
+# must beat a bare "for 2" that may be a trip length ("for 2 weeks")
+_TRAVELER_COUNT_PATTERNS = tuple(
+    re.compile(pattern)
+    for pattern in (
+        # Match suggestions like "2 travelers", "4 travelers (family)"
+        r"(\d+)\s*travelers?\s*(?:\([^)]*\))?",
+        r"(\d+)\s*(?:people|persons|travellers|adults|guests|pax)",
+        r"(?:for|with)\s*(\d+)\s*(?:people|persons|travelers|adults)?",
+        r"(\d+)\s*of\s*us",
+        r"we\s*are\s*(\d+)",
+        r"group\s*of\s*(\d+)",  # "Group of 6"
+        r"family\s*of\s*(\d+)",
+        r"^\s*(\d+)\s*$",  # Just a number
+    )
+)
+
+
+def _match_travelers(msg_lower: str) -> Optional[Tuple[int, str]]:
+    """
+    Find a traveler count. Returns (count, kind) or None.
+
+    Solo phrases win over couple phrases (one scan for both), which win over
+    the first numeric pattern, in priority order, with a count in the 1-20 range.
+    """
+    couple = None
+    for match in _TRAVELERS_RE.finditer(msg_lower):
+        if match.lastgroup == "solo":
+            return 1, "solo"
+        couple = (2, "couple")
+    if couple:
+        return couple
+    for pattern in _TRAVELER_COUNT_PATTERNS:
+        match = pattern.search(msg_lower)
+        if match:
+            num = int(match.group(1))
+            if 1 <= num <= 20:
+                return num, "count"
+    return None
+
+
+# Number words accepted in relative-time and traveler phrases
+_WORD_NUMS = {
+    "one": 1,
+    "two": 2,
+    "three": 3,
+    "four": 4,
+    "five": 5,
+    "six": 6,
+    "seven": 7,
+    "eight": 8,
+    "nine": 9,
+    "ten": 10,
+    "a": 1,
+    "an": 1,
+    "couple": 2,
+    "few": 3,
+}
+
+# Month names and abbreviations
+_MONTHS = {
+    "january": 1,
+    "february": 2,
+    "march": 3,
+    "april": 4,
+    "may": 5,
+    "june": 6,
+    "july": 7,
+    "august": 8,
+    "september": 9,
+    "october": 10,
+    "november": 11,
+    "december": 12,
+    "jan": 1,
+    "feb": 2,
+    "mar": 3,
+    "apr": 4,
+    "jun": 6,
+    "jul": 7,
+    "aug": 8,
+    "sep": 9,
+    "sept": 9,
+    "oct": 10,
+    "nov": 11,
+    "dec": 12,
+}
+
+# Any month alias, longest first so "september" wins over "sep"
+_MONTH_ALTERNATION = "|".join(sorted(_MONTHS, key=len, reverse=True))
+_MONTH_RE = re.compile(rf"\b(?:{_MONTH_ALTERNATION})\b")
+# Month with a day on either side, e.g. "march 15" or "15th of march"
+_MONTH_DAY_RE = re.compile(
+    rf"(?P<m1>{_MONTH_ALTERNATION})\s+(?P<d1>\d{{1,2}})"
+    rf"|(?P<d2>\d{{1,2}})\s*(?:st|nd|rd|th)?\s*(?:of\s+)?(?P<m2>{_MONTH_ALTERNATION})"
+)
+
+
+def _month_day(msg_lower: str, month_name: str) -> Optional[int]:
+    """Day of month written next to month_name in msg_lower, if any."""
+    for match in _MONTH_DAY_RE.finditer(msg_lower):
+        if (match["m1"] or match["m2"]) == month_name:
+            return int(match["d1"] or match["d2"])
+    return None
+
+
+# Every word-traveler pattern needs one of these after the number word
+_WORD_TRAVELER_CONTEXT = ("people", "person", "travelers", "adults", "of us")
+
+# Number word + people/travelers context (skips a/an/couple/few alone)
+_WORD_TRAVELER_PATTERNS = tuple(
+    (re.compile(rf"\b{word}\b.*(?:people|person|travelers|adults|of us)"), num)
+    for word, num in (
+        ("one", 1),
+        ("two", 2),
+        ("three", 3),
+        ("four", 4),
+        ("five", 5),
+        ("six", 6),
+        ("seven", 7),
+        ("eight", 8),
+        ("nine", 9),
+        ("ten", 10),
+    )
+)
+
+# "in X days/weeks/months" or just "X days/weeks/months"
+_RELATIVE_TIME_RE = re.compile(
+    r"(?:in\s+)?(\d+|one|two|three|four|five|six|seven|eight|nine|ten|a|an|couple|few)\s+(day|days|week|weeks|month|months)(?:\s+(?:from now|later|away|time))?"
+)
+_WEEKEND_RE = re.compile(r"(this|next|coming|upcoming)\s*weekend")
+# Explicit date range like "March 15-20"
+_EXPLICIT_RANGE_RE = re.compile(
+    r"(january|february|march|april|may|june|july|august|september|october|november|december|jan|feb|mar|apr|jun|jul|aug|sep|oct|nov|dec)\s+(\d{1,2})(?:st|nd|rd|th)?\s*(?:-|to)\s*(?:\w+\s+)?(\d{1,2})(?:st|nd|rd|th)?"
+)
+_DAY_RANGE_RE = re.compile(r"(\w+)\s+(\d{1,2})\s*(?:-|to)\s*(\d{1,2})")
+_MONTH_RANGE_RE = re.compile(r"(?:from\s+)?(\w+)\s+(?:to|through|thru|-)\s+(\w+)")
+_YEAR_PREFIX_RE = re.compile(r"20(\d{2})")
+_ISO_DATE_RE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+_US_DATE_RE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{2,4})")
+_EU_DATE_RE = re.compile(r"(\d{1,2})[./](\d{1,2})[./](\d{2,4})")
+_YEAR_ONLY_RE = re.compile(r"\b(202[5-9]|203[0-9])\b")
+_BUDGET_RE = re.compile(r"\$\s*(\d+[,\d]*)")
+
+# Cues that a message mentions a travel field; if any cued field is missing from
+# the pattern extraction, the LLM is asked instead (origin and preferences are
+# never pattern-extracted, so their cues always defer to the LLM)
+_EXTRACT_FIELD_CUES = (
+    ("origin", re.compile(r"\bfrom\s+(?!now\b)[a-z]|\b(?:flying out of|departing|leaving)\b")),
+    ("destination", re.compile(r"\b(?:to|visit|visiting|destination)\b")),
+    (
+        "travel_dates",
+        re.compile(
+            r"\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\b"
+            r"|\b(?:days?|weeks?|weekend|months?|year|tomorrow|today|tonight)\b"
+            r"|\d{1,4}[/.-]\d{1,2}"
+        ),
+    ),
+    (
+        "travelers",
+        re.compile(
+            r"\b(?:people|persons?|travell?ers|adults|kids|children|of us|family"
+            r"|solo|alone|myself|couple|wife|husband|partner|friends?)\b"
+        ),
+    ),
+    ("budget_usd", re.compile(r"\$|\b(?:budget|usd|dollars?|\d+k)\b")),
+    (
+        "preferences",
+        re.compile(
+            r"\b(?:prefer|preference|beach|luxury|romantic|adventure|resort|nonstop"
+            r"|direct flight|boutique|all.inclusive)\b"
+        ),
+    ),
+)
+
+
+def _simple_extract_covers(msg_lower: str, extracted: Dict[str, Any]) -> bool:
+    """Whether pattern extraction matched every travel field msg_lower mentions."""
+    return all(
+        field in extracted or not cue.search(msg_lower)
+        for field, cue in _EXTRACT_FIELD_CUES
+    )
+
+
+# Checkout contact details - one scan finds both email and phone candidates
+_CONTACT_RE = re.compile(
+    r"(?P<email>[\w\.-]+@[\w\.-]+\.\w+)|(?P<phone>[\+\d][\d\s\-\(\)\.]{7,})"
+)
+
+
+def _scan_contact(message: str) -> Dict[str, str]:
+    """Return the first email and phone candidates found in one pass over message."""
+    found: Dict[str, str] = {}
+    for match in _CONTACT_RE.finditer(message):
+        found.setdefault(match.lastgroup, match.group())
+        if len(found) == 2:
+            break
+    return found
+
+
+# LLM output cleanup
+_THINK_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
+_JSON_OBJECT_RE = re.compile(r"\{[\s\S]*\}")
+
+# LLM outputs at least this long are parsed in a worker thread
+_OFFLOAD_PARSE_CHARS = 16_384
+
+
+async def _parse_off_loop(parse, text: str) -> Any:
+    """Run a CPU-bound parse inline for short text, in a worker thread for long text."""
+    if len(text) < _OFFLOAD_PARSE_CHARS:
+        return parse(text)
+    return await asyncio.to_thread(parse, text)
+
+
+def _parse_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """Parse text as a JSON object, falling back to its outermost {...} span."""
+    # The prompts ask for bare JSON, so try that before scanning
+    try:
+        result = orjson.loads(text)
+        if isinstance(result, dict):
+            return result
+    except orjson.JSONDecodeError:
+        pass
+    match = _JSON_OBJECT_RE.search(text)
+    return orjson.loads(match.group()) if match else None
+
+
+def _parse_travel_json(response_text: str) -> Optional[Dict[str, Any]]:
+    """Pull the travel-info JSON object out of a free-form LLM reply."""
+    json_text = response_text
+
+    # Remove LLM thinking tags if present
+    if "<think>" in json_text:
+        json_text = _THINK_RE.sub("", json_text)
+
+    # Try to extract JSON from code blocks
+    if "```json" in json_text:
+        json_text = json_text.split("```json")[1].split("```")[0]
+    elif "```" in json_text:
+        json_text = json_text.split("```")[1].split("```")[0]
+
+    # Try to find JSON object directly
+    json_text = json_text.strip()
+    if not json_text.startswith("{"):
+        # Look for JSON object in the text
+        match = _JSON_OBJECT_RE.search(json_text)
+        if match:
+            json_text = match.group(0)
+            # Handle trailing text by finding the last closing brace
+            last_brace_index = json_text.rfind("}")
+            if last_brace_index != -1:
+                json_text = json_text[: last_brace_index + 1]
+
+    # Clean up common issues
+    json_text = json_text.strip()
+
+    if not json_text or not json_text.startswith("{"):
+        return None
+    return orjson.loads(json_text)
+
+
+# Invariant instructions for intent classification. Sent verbatim as the system
+# message so the provider can reuse the cached prompt prefix across turns.
+_INTENT_SYSTEM_PROMPT = """You are an AI travel assistant orchestrator. Analyze the user message (given with its conversation context) and decide the intent and action.
+
+Classify the intent and extract any relevant data. Output ONLY a JSON object:
+
+{
+  "intent": "<one of: greeting, provide_info, confirm_yes, confirm_no, select_package, provide_checkout, select_payment, cancel, question, other>",
+  "confidence": <0.0 to 1.0>,
+  "extracted_data": {
+    "destination": "<city/country or null>",
+    "origin": "<departure city or null>",
+    "travel_dates": {"start": "YYYY-MM-DD", "end": "YYYY-MM-DD"} or null,
+    "travelers": <number or null>,
+    "budget_usd": <number or null>,
+    "cabin_class": "<economy/business/first or null>",
+    "preferences": ["<list>"] or null,
+    "selected_package": "<value/recommended/premium or null>",
+    "name": "<full name or null>",
+    "email": "<email or null>",
+    "phone": "<phone or null>",
+    "payment_method": "<card/wallet or null>"
+  },
+  "reasoning": "<brief explanation of why this intent>"
+}
+
+INTENT GUIDE:
+- "greeting": Pure greeting like "hi", "hello", "hey" with no travel content
+- "provide_info": User sharing destination, dates, travelers, budget, preferences
+- "confirm_yes": Agreeing/confirming like "yes", "proceed", "looks good", "that's right"
+- "confirm_no": Declining like "no", "change", "modify", "not quite"
+- "select_package": Choosing a package like "value", "premium", "recommended", "the first one", "cheapest"
+- "provide_checkout": Giving name, email, phone, or address
+- "select_payment": Choosing "card", "wallet", "visa", "mastercard"
+- "cancel": "cancel", "start over", "forget it"
+- "question": Asking about something (what, why, how, can you)
+- "other": Unclear or unrelated
+
+EXTRACTION RULES:
+- Fill every travel field the message mentions; resolve relative dates against Today
+- travel_dates needs both start and end; if only a duration is given, count from start
+- Use null for anything not mentioned - never guess
+
+EXAMPLE:
+Today: 2026-03-01
+USER MESSAGE: "Paris from Boston for 2 people, Apr 10-15, around $4000"
+{"intent": "provide_info", "confidence": 0.95, "extracted_data": {"destination": "Paris", "origin": "Boston", "travel_dates": {"start": "2026-04-10", "end": "2026-04-15"}, "travelers": 2, "budget_usd": 4000, "cabin_class": null, "preferences": null, "selected_package": null, "name": null, "email": null, "phone": null, "payment_method": null}, "reasoning": "User gave destination, origin, dates, travelers and budget"}
+
+OUTPUT ONLY THE JSON, no explanation."""
+
+# Invariant instructions for travel-info extraction, sent as the system message
+# for the same prefix reuse; the message, current info and date go in the user turn.
+_EXTRACT_SYSTEM_PROMPT = """Extract travel info from the user message. Output ONLY a JSON object, nothing else.
+
+Output this exact JSON format with extracted values (use null if not mentioned):
+{"destination": null, "origin": null, "travel_dates": null, "travelers": null, "budget_usd": null, "cabin_class": null, "preferences": null}
+
+Examples:
+- "Paris" -> {"destination": "Paris", "origin": null, "travel_dates": null, "travelers": null, "budget_usd": null, "cabin_class": null, "preferences": null}
+- "next month" -> {"destination": null, "origin": null, "travel_dates": {"start": "2026-03-21", "end": "2026-03-26"}, "travelers": null, "budget_usd": null, "cabin_class": null, "preferences": null}
+- "2 people" -> {"destination": null, "origin": null, "travel_dates": null, "travelers": 2, "budget_usd": null, "cabin_class": null, "preferences": null}
+
+Output JSON only."""
+
 
 class ConversationStage(str, Enum):
     """Conversation stages for multi-turn flow"""
@@ -97,9 +772,28 @@ class ShoppingAgent:
     REQUIRED_FIELDS = ["destination", "travel_dates", "travelers"]
     OPTIONAL_FIELDS = ["origin", "budget_usd", "cabin_class", "preferences"]
 
+    # Live sessions kept in memory; least recently used are evicted first
+    MAX_SESSIONS = 10_000
+
+    # Messages kept per session (user + assistant turns)
+    HISTORY_MAX_MESSAGES = 40
+    # Assistant text kept per history entry; the full payload lives in _last_response
+    HISTORY_CONTENT_MAX_CHARS = 500
+
     def __init__(self):
         self.agent_id = SHOPPING_AGENT_ID
-        self.sessions: Dict[str, Dict[str, Any]] = {}
+        # LRU order: least recently active session first
+        self.sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Serializes concurrent turns for the same session
+        self._session_locks: Dict[str, asyncio.Lock] = {}
+        # Exact-match cache of LLM intent classifications: key -> serialized result
+        self._intent_cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._intent_cache_size = 1024
+        # In-flight classifications by cache key (concurrent duplicates share one)
+        self._intent_inflight: Dict[str, "asyncio.Future[Optional[bytes]]"] = {}
+        # Exact-match cache of LLM travel-info extractions: key -> serialized result
+        self._extract_cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._extract_cache_size = 512
         self.a2a_client = A2AClient(
             agent_name=self.agent_id,
             agent_url="http://localhost:8000",
@@ -135,104 +829,99 @@ class ShoppingAgent:
         # Build context for LLM
         context_parts = []
         if collected:
-            context_parts.append(f"Already collected: {json.dumps(collected)}")
+            # Stable key order so identical state yields identical prompts
+            context_parts.append(f"Already collected: {self._collected_json(session)}")
         if packages:
-            pkg_names = [
+            pkg_names = sorted(
                 p.tier if hasattr(p, "tier") else p.get("tier", "unknown")
                 for p in packages
-            ]
+            )
             context_parts.append(f"Available packages: {pkg_names}")
         context_parts.append(f"Current stage: {stage}")
+        context_parts.append(f"Today: {datetime.now().strftime('%Y-%m-%d')}")
 
         context = "\n".join(context_parts) if context_parts else "No context yet"
 
-        prompt = f"""You are an AI travel assistant orchestrator. Analyze the user message and decide the intent and action.
-
-CONTEXT:
+        # Same (normalized) message in the same context -> reuse the classification
+        normalized = " ".join(message.lower().split())
+        cache_key = hashlib.blake2b(
+            f"{context}\x00{normalized}".encode(), digest_size=16
+        ).hexdigest()
+        cached = self._intent_cache.get(cache_key)
+        if cached is not None:
+            self._intent_cache.move_to_end(cache_key)
+            logger.info("[LLM Orchestrator] Intent cache hit")
+            return orjson.loads(cached)
+
+        user_prompt = f"""CONTEXT:
 {context}
 
-USER MESSAGE: "{message}"
+USER MESSAGE: "{message}"""
 
-Classify the intent and extract any relevant data. Output ONLY a JSON object:
+        # Identical classifications already in flight share one LLM call
+        pending = self._intent_inflight.get(cache_key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._request_intent(user_prompt))
+            self._intent_inflight[cache_key] = pending
+            pending.add_done_callback(
+                lambda _: self._intent_inflight.pop(cache_key, None)
+            )
+        else:
+            logger.info("[LLM Orchestrator] Joining in-flight classification")
 
-{{
-  "intent": "<one of: greeting, provide_info, confirm_yes, confirm_no, select_package, provide_checkout, select_payment, cancel, question, other>",
-  "confidence": <0.0 to 1.0>,
-  "extracted_data": {{
-    "destination": "<city/country or null>",
-    "origin": "<departure city or null>",
-    "travel_dates": {{"start": "YYYY-MM-DD", "end": "YYYY-MM-DD"}} or null,
-    "travelers": <number or null>,
-    "budget_usd": <number or null>,
-    "cabin_class": "<economy/business/first or null>",
-    "preferences": ["<list>"] or null,
-    "selected_package": "<value/recommended/premium or null>",
-    "name": "<full name or null>",
-    "email": "<email or null>",
-    "phone": "<phone or null>",
-    "payment_method": "<card/wallet or null>"
-  }},
-  "reasoning": "<brief explanation of why this intent>"
-}}
+        # Shield so one cancelled caller does not cancel the shared request
+        result_json = await asyncio.shield(pending)
+        if result_json is not None:
+            self._intent_cache[cache_key] = result_json
+            if len(self._intent_cache) > self._intent_cache_size:
+                self._intent_cache.popitem(last=False)
+            return orjson.loads(result_json)
 
-INTENT GUIDE:
-- "greeting": Pure greeting like "hi", "hello", "hey" with no travel content
-- "provide_info": User sharing destination, dates, travelers, budget, preferences
-- "confirm_yes": Agreeing/confirming like "yes", "proceed", "looks good", "that's right"
-- "confirm_no": Declining like "no", "change", "modify", "not quite"
-- "select_package": Choosing a package like "value", "premium", "recommended", "the first one", "cheapest"
-- "provide_checkout": Giving name, email, phone, or address
-- "select_payment": Choosing "card", "wallet", "visa", "mastercard"
-- "cancel": "cancel", "start over", "forget it"
-- "question": Asking about something (what, why, how, can you)
-- "other": Unclear or unrelated
-
-OUTPUT ONLY THE JSON, no explanation."""
+        # Fallback: use simple pattern matching
+        return self._classify_intent_simple(message, session)
 
+    async def _request_intent(self, user_prompt: str) -> Optional[bytes]:
+        """Run one intent classification LLM call. Returns the serialized result or None."""
         try:
             start_time = time.time()
-            async with httpx.AsyncClient(timeout=OPENROUTER_TIMEOUT) as client:
-                resp = await client.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": OPENROUTER_MODEL,
-                        "messages": [{"role": "user", "content": prompt}],
-                        "temperature": 0.1
-                    }
-                )
-                resp.raise_for_status()
-                data = resp.json()
-                content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+            client = await _get_client()
+            # Stream and stop at the closing brace - the model often keeps
+            # generating commentary after the JSON object
+            content, json_text = await _stream_json_object(
+                client,
+                {
+                    "model": OPENROUTER_MODEL,
+                    "messages": [
+                        {"role": "system", "content": _INTENT_SYSTEM_PROMPT},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    "temperature": 0.1
+                },
+            )
 
             elapsed = time.time() - start_time
 
             log_llm_call(
-                logger, "intent_classification", prompt[:200], content, elapsed
+                logger, "intent_classification", user_prompt[:200], content, elapsed
             )
 
-            # Remove <think> tags if present (some LLMs add these)
-            content = re.sub(
-                r"<think>.*?</think>", "", content, flags=re.DOTALL
-            ).strip()
+            if json_text is not None:
+                result = orjson.loads(json_text)
+            else:
+                # No early exit - search the whole reply (<think> spans were
+                # already dropped while streaming)
+                result = await _parse_off_loop(_parse_json_object, content)
 
-            # Extract JSON
-            json_match = re.search(r"\{[\s\S]*\}", content)
-            if json_match:
-                result = json.loads(json_match.group())
+            if result is not None:
                 logger.info(
                     f"[LLM Orchestrator] Intent: {result.get('intent')}, Confidence: {result.get('confidence')}"
                 )
-                return result
+                return orjson.dumps(result)
 
         except Exception as e:
             logger.warning(f"[LLM Orchestrator] Failed: {e}")
 
-        # Fallback: use simple pattern matching
-        return self._classify_intent_simple(message, session)
+        return None
 
     def _classify_intent_simple(self, message: str, session: Dict) -> Dict[str, Any]:
         """Fast pattern-based intent classification as fallback."""
@@ -240,17 +929,7 @@ OUTPUT ONLY THE JSON, no explanation."""
         stage = session.get("stage", ConversationStage.GREETING)
 
         # Pure greetings
-        if msg_lower in [
-            "hi",
-            "hello",
-            "hey",
-            "howdy",
-            "hola",
-            "greetings",
-            "good morning",
-            "good afternoon",
-            "good evening",
-        ]:
+        if msg_lower in _PURE_GREETINGS:
             return {
                 "intent": "greeting",
                 "confidence": 1.0,
@@ -259,10 +938,7 @@ OUTPUT ONLY THE JSON, no explanation."""
             }
 
         # Cancel
-        if any(
-            w in msg_lower
-            for w in ["cancel", "start over", "forget it", "never mind", "nevermind"]
-        ):
+        if _CANCEL_RE.search(msg_lower):
             return {
                 "intent": "cancel",
                 "confidence": 0.9,
@@ -271,31 +947,7 @@ OUTPUT ONLY THE JSON, no explanation."""
             }
 
         # Confirmations - match exact suggestions and common phrases
-        confirm_phrases = [
-            "yes",
-            "yeah",
-            "yep",
-            "sure",
-            "ok",
-            "okay",
-            "proceed",
-            "continue",
-            "looks good",
-            "perfect",
-            "great",
-            "let's go",
-            "confirm",
-            "correct",
-            "that's right",
-            "yes, search",
-            "search for packages",
-            "find packages",
-            "yes, let's start",
-            "start fresh",
-        ]
-        if msg_lower in confirm_phrases or any(
-            phrase in msg_lower for phrase in confirm_phrases
-        ):
+        if _CONFIRM_RE.search(msg_lower):
             return {
                 "intent": "confirm_yes",
                 "confidence": 0.9,
@@ -304,24 +956,7 @@ OUTPUT ONLY THE JSON, no explanation."""
             }
 
         # Decline/modify - match exact suggestions
-        decline_phrases = [
-            "no",
-            "nope",
-            "change",
-            "modify",
-            "edit",
-            "not quite",
-            "wrong",
-            "change destination",
-            "change dates",
-            "change travelers",
-            "change budget",
-            "add preferences",
-            "no thanks",
-        ]
-        if msg_lower in decline_phrases or any(
-            phrase in msg_lower for phrase in decline_phrases
-        ):
+        if _DECLINE_RE.search(msg_lower):
             return {
                 "intent": "confirm_no",
                 "confidence": 0.9,
@@ -360,39 +995,20 @@ OUTPUT ONLY THE JSON, no explanation."""
                     "extracted_data": {},
                     "reasoning": "Show packages again",
                 }
-            # Generic keywords
-            for pkg in [
-                "value",
-                "recommended",
-                "premium",
-                "cheapest",
-                "budget",
-                "best",
-                "expensive",
-                "luxury",
-            ]:
-                if pkg in msg_lower:
-                    selected = (
-                        "value"
-                        if pkg in ["value", "cheapest", "budget"]
-                        else "premium"
-                        if pkg in ["premium", "expensive", "luxury"]
-                        else "recommended"
-                    )
-                    return {
-                        "intent": "select_package",
-                        "confidence": 0.8,
-                        "extracted_data": {"selected_package": selected},
-                        "reasoning": f"Package keyword: {pkg}",
-                    }
+            # Generic keywords (whole words; the first one in the message wins)
+            match = _PACKAGE_KEYWORD_RE.search(msg_lower)
+            if match:
+                return {
+                    "intent": "select_package",
+                    "confidence": 0.8,
+                    "extracted_data": {"selected_package": match.lastgroup},
+                    "reasoning": f"Package keyword: {match.group()}",
+                }
 
         # Checkout details - collecting name, email, address or selecting checkout method
         if stage == ConversationStage.CHECKOUT_DETAILS:
             # Check for digital wallet / quick checkout selection (check this FIRST)
-            if any(
-                word in msg_lower
-                for word in ["wallet", "digital", "quick", "express", "📱"]
-            ):
+            if _CHECKOUT_WALLET_RE.search(msg_lower):
                 return {
                     "intent": "select_digital_wallet",
                     "confidence": 0.95,
@@ -401,10 +1017,7 @@ OUTPUT ONLY THE JSON, no explanation."""
                 }
 
             # Check for manual checkout selection
-            if any(
-                word in msg_lower
-                for word in ["manual", "fill", "enter", "myself", "💳"]
-            ):
+            if _CHECKOUT_MANUAL_RE.search(msg_lower):
                 return {
                     "intent": "select_manual_checkout",
                     "confidence": 0.95,
@@ -413,9 +1026,7 @@ OUTPUT ONLY THE JSON, no explanation."""
                 }
 
             # Check for edit/change request
-            if any(
-                word in msg_lower for word in ["edit", "change", "modify", "correct"]
-            ):
+            if _CHECKOUT_EDIT_RE.search(msg_lower):
                 return {
                     "intent": "confirm_no",
                     "confidence": 0.9,
@@ -424,10 +1035,7 @@ OUTPUT ONLY THE JSON, no explanation."""
                 }
 
             # Check for confirmation to proceed
-            if any(
-                word in msg_lower
-                for word in ["yes", "proceed", "continue", "confirm", "ok"]
-            ):
+            if _CHECKOUT_CONFIRM_RE.search(msg_lower):
                 return {
                     "intent": "confirm_yes",
                     "confidence": 0.9,
@@ -462,26 +1070,6 @@ OUTPUT ONLY THE JSON, no explanation."""
                 "reasoning": "Checkout information",
             }
 
-            # Check for confirmation to proceed
-            if any(
-                word in msg_lower
-                for word in ["yes", "proceed", "continue", "confirm", "ok"]
-            ):
-                return {
-                    "intent": "confirm_yes",
-                    "confidence": 0.9,
-                    "extracted_data": {},
-                    "reasoning": "User confirmed checkout details",
-                }
-
-            # Probably an address or other checkout info
-            return {
-                "intent": "provide_checkout",
-                "confidence": 0.8,
-                "extracted_data": {"address": message.strip()},
-                "reasoning": "Checkout information",
-            }
-
         # Payment selection - match exact suggestions and common phrases
         if stage == ConversationStage.PAYMENT_SELECTION:
             # "Pay with ..." is the exact suggestion format
@@ -492,37 +1080,14 @@ OUTPUT ONLY THE JSON, no explanation."""
                     "extracted_data": {"payment_method": "card"},
                     "reasoning": "Pay with card suggestion",
                 }
-            if any(
-                w in msg_lower
-                for w in [
-                    "card",
-                    "credit",
-                    "debit",
-                    "visa",
-                    "mastercard",
-                    "credit card",
-                    "debit card",
-                    "first",
-                    "proceed",
-                    "yes",
-                ]
-            ):
+            if _PAYMENT_CARD_RE.search(msg_lower):
                 return {
                     "intent": "select_payment",
                     "confidence": 0.8,
                     "extracted_data": {"payment_method": "card"},
                     "reasoning": "Card payment",
                 }
-            if any(
-                w in msg_lower
-                for w in [
-                    "wallet",
-                    "paypal",
-                    "apple pay",
-                    "google pay",
-                    "digital wallet",
-                ]
-            ):
+            if _PAYMENT_WALLET_RE.search(msg_lower):
                 return {
                     "intent": "select_payment",
                     "confidence": 0.8,
@@ -541,19 +1106,7 @@ OUTPUT ONLY THE JSON, no explanation."""
                 }
 
         # Questions
-        if msg_lower.startswith(
-            (
-                "what",
-                "why",
-                "how",
-                "when",
-                "where",
-                "can you",
-                "could you",
-                "is there",
-                "are there",
-            )
-        ):
+        if msg_lower.startswith(_QUESTION_PREFIXES):
             return {
                 "intent": "question",
                 "confidence": 0.7,
@@ -573,24 +1126,97 @@ OUTPUT ONLY THE JSON, no explanation."""
         self, session_id: Optional[str], user_id: str
     ) -> tuple[str, Dict[str, Any]]:
         """Get existing session or create a new one."""
+        now = time.time()
         if session_id and session_id in self.sessions:
-            return session_id, self.sessions[session_id]
+            session = self.sessions[session_id]
+            if now - session.get("last_active", now) <= SESSION_IDLE_TTL_SEC:
+                session["last_active"] = now
+                self.sessions.move_to_end(session_id)
+                return session_id, session
+            # Expired - start the conversation over under the same id
+            del self.sessions[session_id]
 
-        session_id = session_id or str(uuid.uuid4())
+        session_id = session_id or secrets.token_urlsafe(16)
+        while len(self.sessions) >= self.MAX_SESSIONS:
+            evicted, _ = self.sessions.popitem(last=False)
+            # A held lock stays; the sweeper drops it once it is released
+            lock = self._session_locks.get(evicted)
+            if lock is not None and not lock.locked():
+                del self._session_locks[evicted]
         self.sessions[session_id] = {
             "user_id": user_id,
             "stage": ConversationStage.GREETING,
             "collected_info": {},
-            "conversation_history": [],
+            # Serialized collected_info for prompts; reset whenever it changes
+            "_collected_json": None,
+            "conversation_history": deque(maxlen=self.HISTORY_MAX_MESSAGES),
+            "_last_response": None,
             "packages": [],
             "selected_package": None,
             "checkout_details": {},
             "cart_mandate": None,
             "payment_mandate": None,
-            "created_at": datetime.utcnow().isoformat(),
+            # Epoch nanoseconds; rendered as ISO only when the session is served
+            "created_at": time.time_ns(),
+            "last_active": now,
         }
         return session_id, self.sessions[session_id]
 
+    @staticmethod
+    def _update_collected(session: Dict, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge updates into collected_info and invalidate its cached JSON."""
+        collected = session.setdefault("collected_info", {})
+        if updates:
+            collected.update(updates)
+            session["_collected_json"] = None
+        return collected
+
+    @staticmethod
+    def _clear_collected(session: Dict) -> None:
+        """Reset collected_info and its cached JSON."""
+        session["collected_info"] = {}
+        session["_collected_json"] = None
+
+    @staticmethod
+    def _collected_json(session: Dict) -> str:
+        """Sorted-key JSON of collected_info, serialized once per change."""
+        cached = session.get("_collected_json")
+        if cached is None:
+            cached = session["_collected_json"] = orjson.dumps(
+                session.get("collected_info", {}),
+                option=orjson.OPT_SORT_KEYS,
+                default=str,
+            ).decode()
+        return cached
+
+    def prune_idle_sessions(self, max_idle_sec: float = SESSION_IDLE_TTL_SEC) -> int:
+        """Evict sessions idle for longer than max_idle_sec. Returns the number removed."""
+        cutoff = time.time() - max_idle_sec
+        stale = []
+        # Sessions are kept in LRU order, so stop at the first active one
+        for sid, session in self.sessions.items():
+            if session.get("last_active", 0) >= cutoff:
+                break
+            stale.append(sid)
+        for sid in stale:
+            del self.sessions[sid]
+        # Drop locks for sessions that are gone and not currently held
+        for sid in [
+            sid
+            for sid, lock in self._session_locks.items()
+            if sid not in self.sessions and not lock.locked()
+        ]:
+            del self._session_locks[sid]
+        if stale:
+            logger.info(f"Evicted {len(stale)} idle sessions")
+        return len(stale)
+
+    async def run_session_sweeper(self, interval_sec: float = 300) -> None:
+        """Background loop that periodically evicts idle sessions."""
+        while True:
+            await asyncio.sleep(interval_sec)
+            self.prune_idle_sessions()
+
     async def process_user_message(
         self, message: str, user_id: str = "demo_user", session_id: Optional[str] = None
     ) -> Dict[str, Any]:
@@ -601,7 +1227,21 @@ OUTPUT ONLY THE JSON, no explanation."""
         1. LLM classifies intent and extracts entities
         2. Route to action handler based on intent (not just stage)
         3. Stage tracks conversation state for context
+
+        Turns for the same session are processed one at a time so a
+        double-submit cannot interleave updates to the session state.
         """
+        session_id = session_id or secrets.token_urlsafe(16)
+        lock = self._session_locks.get(session_id)
+        if lock is None:
+            lock = self._session_locks[session_id] = asyncio.Lock()
+        async with lock:
+            return await self._process_user_message(message, user_id, session_id)
+
+    async def _process_user_message(
+        self, message: str, user_id: str, session_id: str
+    ) -> Dict[str, Any]:
+        """Run one conversation turn; caller holds the session lock."""
         session_id, session = self._get_or_create_session(session_id, user_id)
         session["conversation_history"].append({"role": "user", "content": message})
         stage = session["stage"]
@@ -629,7 +1269,7 @@ OUTPUT ONLY THE JSON, no explanation."""
         if stage in fast_stages:
             intent_result = self._classify_intent_simple(message, session)
             logger.info(f"[Orchestrator] Using simple classifier for {stage} stage")
-        elif len(message) > 30 or any(c in message for c in ["$", "@", ",", "."]):
+        elif len(message) > 30 or not _LLM_TRIGGER_CHARS.isdisjoint(message):
             # Only use LLM during GREETING / GATHERING_INFO for entity extraction
             intent_result = await self._classify_intent_with_llm(message, session)
         else:
@@ -642,7 +1282,9 @@ OUTPUT ONLY THE JSON, no explanation."""
         logger.info(f"[Orchestrator] Intent: {intent} (confidence: {confidence})")
 
         # Step 2: Route to action handler based on intent
-        response = await self._route_by_intent(intent, message, extracted, session)
+        response = await self._route_by_intent(
+            intent, message, extracted, session, confidence
+        )
 
         response["session_id"] = session_id
         response["stage"] = session["stage"]
@@ -656,14 +1298,26 @@ OUTPUT ONLY THE JSON, no explanation."""
         if session.get("selected_package") and "selected_package" not in response:
             response["selected_package"] = session["selected_package"]
 
+        # History keeps a short text summary; the full payload is kept once
         session["conversation_history"].append(
-            {"role": "assistant", "content": response}
+            {
+                "role": "assistant",
+                "content": (response.get("message") or "")[
+                    : self.HISTORY_CONTENT_MAX_CHARS
+                ],
+            }
         )
+        session["_last_response"] = response
 
         return response
 
     async def _route_by_intent(
-        self, intent: str, message: str, extracted: Dict, session: Dict
+        self,
+        intent: str,
+        message: str,
+        extracted: Dict,
+        session: Dict,
+        confidence: float = 0.5,
     ) -> Dict[str, Any]:
         """Route to appropriate handler based on classified intent."""
         stage = session["stage"]
@@ -719,7 +1373,9 @@ OUTPUT ONLY THE JSON, no explanation."""
 
         elif intent == "provide_info":
             # User is providing travel info - extract and update
-            return await self._handle_provide_info(message, extracted, session)
+            return await self._handle_provide_info(
+                message, extracted, session, confidence
+            )
 
         elif intent == "confirm_yes":
             # User confirming - action depends on stage
@@ -792,11 +1448,24 @@ OUTPUT ONLY THE JSON, no explanation."""
             # "other" or unknown - try to handle based on current stage
             return await self._handle_by_stage(message, session)
 
+    @staticmethod
+    def _needs_llm_extraction(message: str) -> bool:
+        """Whether a provide_info message is long enough to need LLM extraction."""
+        return not (len(message.strip()) < 40 or len(message.split()) <= 5)
+
     async def _handle_provide_info(
-        self, message: str, extracted: Dict, session: Dict
+        self,
+        message: str,
+        extracted: Dict,
+        session: Dict,
+        confidence: float = 0.5,
     ) -> Dict[str, Any]:
-        """Handle user providing travel information."""
+        """
+        Handle user providing travel information.
+        confidence is the intent classifier's; its extracted data is trusted when high.
+        """
         stage = session.get("stage", ConversationStage.GATHERING_INFO)
+        msg_lower = message.lower().strip()
 
         # If we're in checkout/payment stages, don't treat as travel info gathering
         if stage == ConversationStage.CHECKOUT_DETAILS:
@@ -818,30 +1487,37 @@ OUTPUT ONLY THE JSON, no explanation."""
             # If we're in payment selection, treat as payment method or confirmation
             return await self._continue_flow(session)
 
-        collected = session.get("collected_info", {})
+        def usable(values: Dict) -> Dict:
+            return {
+                key: value
+                for key, value in values.items()
+                if value and value != "null" and str(value) != "None"
+            }
 
         # First, merge any extracted data from LLM intent classification
-        for key, value in extracted.items():
-            if value and value != "null" and str(value) != "None":
-                collected[key] = value
+        classified = usable(extracted)
+        collected = self._update_collected(session, classified)
 
         # For short messages, use simple extraction directly (faster, more reliable)
-        if len(message.strip()) < 40 or len(message.split()) <= 5:
-            simple_result = self._simple_extract(message)
+        if not self._needs_llm_extraction(message):
+            simple_result = self._simple_extract(message, msg_lower)
             if simple_result:
                 logger.info(f"[ProvideInfo] Using simple extraction: {simple_result}")
-                for key, value in simple_result.items():
-                    if value and value != "null" and str(value) != "None":
-                        collected[key] = value
+                collected = self._update_collected(session, usable(simple_result))
         else:
-            # For longer messages, use LLM extraction
-            detailed_extracted = await self._extract_travel_info(message, collected)
+            # The classifier already extracted travel fields in the same call - only
+            # pay for a second, dedicated extraction when that looks unreliable
+            travel_fields = self.REQUIRED_FIELDS + self.OPTIONAL_FIELDS
+            needs_deep = confidence < 0.7 or not any(
+                field in classified for field in travel_fields
+            )
+            detailed_extracted = (
+                await self._extract_travel_info(message, collected, msg_lower)
+                if needs_deep
+                else None
+            )
             if detailed_extracted:
-                for key, value in detailed_extracted.items():
-                    if value and value != "null" and str(value) != "None":
-                        collected[key] = value
-
-        session["collected_info"] = collected
+                collected = self._update_collected(session, usable(detailed_extracted))
 
         # Check what we have vs what we need
         missing = self._get_missing_fields(collected)
@@ -858,7 +1534,7 @@ OUTPUT ONLY THE JSON, no explanation."""
     async def _handle_question(self, message: str, session: Dict) -> Dict[str, Any]:
         """Handle user questions using LLM."""
         # Use LLM to answer the question in context
-        context = json.dumps(session.get("collected_info", {}), indent=2)
+        context = self._collected_json(session)
         packages = session.get("packages", [])
 
         prompt = f"""You are a helpful travel assistant. Answer the user's question briefly and helpfully.
@@ -873,24 +1549,17 @@ User question: "{message}"
 Answer in 1-3 sentences, then guide them back to the booking flow if appropriate."""
 
         try:
-            async with httpx.AsyncClient(timeout=OPENROUTER_TIMEOUT) as client:
-                resp = await client.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": OPENROUTER_MODEL,
-                        "messages": [{"role": "user", "content": prompt}],
-                        "temperature": 0.7
-                    }
-                )
-                resp.raise_for_status()
-                data = resp.json()
-                answer = data.get("choices", [{}])[0].get("message", {}).get("content", "")
-
-            answer = re.sub(r"<think>.*?</think>", "", answer, flags=re.DOTALL).strip()
+            client = await _get_client()
+            # Streamed so reasoning (<think>) tokens are discarded as they arrive
+            answer = await _stream_chat_text(
+                client,
+                {
+                    "model": OPENROUTER_MODEL,
+                    "messages": [{"role": "user", "content": prompt}],
+                    "temperature": 0.7
+                },
+            )
+            answer = answer.strip()
         except Exception as e:
             logger.warning(f"LLM question answering failed: {e}")
             answer = "I'd be happy to help! Could you rephrase your question?"
@@ -900,7 +1569,7 @@ Answer in 1-3 sentences, then guide them back to the booking flow if appropriate
     def _handle_cancel(self, session: Dict) -> Dict[str, Any]:
         """Handle cancellation - reset session."""
         session["stage"] = ConversationStage.GREETING
-        session["collected_info"] = {}
+        self._clear_collected(session)
         session["packages"] = []
         session["selected_package"] = None
         session["checkout_details"] = {}
@@ -918,7 +1587,7 @@ Answer in 1-3 sentences, then guide them back to the booking flow if appropriate
 
         # Reset session state for a fresh trip
         session["stage"] = ConversationStage.GATHERING_INFO
-        session["collected_info"] = {}
+        self._clear_collected(session)
         session["packages"] = []
         session["selected_package"] = None
         session["checkout_details"] = {}
@@ -944,8 +1613,7 @@ Ready to plan your next adventure? Tell me where you'd like to go!""",
 
     def reset_session(self, session_id: str) -> Dict[str, Any]:
         """Reset/clear a session completely."""
-        if session_id in self.sessions:
-            del self.sessions[session_id]
+        self.sessions.pop(session_id, None)
         return {
             "success": True,
             "message": "Session cleared successfully.",
@@ -1024,11 +1692,11 @@ Ready to plan your next adventure? Tell me where you'd like to go!""",
         extracted_field = None
 
         # Email pattern - check first
-        email_match = re.search(r"[\w\.-]+@[\w\.-]+\.\w+", message)
-        if email_match:
-            checkout["email"] = email_match.group()
+        email = _scan_contact(message).get("email")
+        if email:
+            checkout["email"] = email
             extracted_field = "email"
-            logger.info(f"[CheckoutInfo] Extracted email: {email_match.group()}")
+            logger.info(f"[CheckoutInfo] Extracted email: {email}")
 
         # Name pattern (if message looks like a name and we don't have name yet)
         elif (
@@ -1318,27 +1986,9 @@ To secure your transaction, an OTP has been sent to your registered device. Plea
             }
 
         # Check if user provided travel details right away
-        has_destination = any(
-            dest in msg_lower
-            for dest in [
-                "dubai",
-                "tokyo",
-                "paris",
-                "london",
-                "bali",
-                "rome",
-                "new york",
-                "singapore",
-                "barcelona",
-                "amsterdam",
-            ]
-        )
-        if has_destination or any(
-            kw in msg_lower
-            for kw in ["trip", "travel", "vacation", "visit", "flight", "book"]
-        ):
+        if _GREETING_TRAVEL_RE.search(msg_lower):
             # Parse whatever info is provided and move to gathering
-            return await self._process_travel_info(message, session)
+            return await self._process_travel_info(message, session, msg_lower)
 
         # Generic greeting with some context
         session["stage"] = ConversationStage.GATHERING_INFO
@@ -1361,21 +2011,27 @@ To secure your transaction, an OTP has been sent to your registered device. Plea
         """Progressively gather travel information."""
         return await self._process_travel_info(message, session)
 
-    async def _process_travel_info(self, message: str, session: Dict) -> Dict[str, Any]:
+    async def _process_travel_info(
+        self, message: str, session: Dict, msg_lower: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Use LLM to extract travel info and determine what's missing."""
 
         # Get current collected info
         collected = session.get("collected_info", {})
 
         # Use LLM to extract info from the message
-        extracted = await self._extract_travel_info(message, collected)
+        extracted = await self._extract_travel_info(message, collected, msg_lower)
 
         if extracted:
             # Merge extracted info with collected
-            for key, value in extracted.items():
-                if value and value != "null" and value != "unknown":
-                    collected[key] = value
-            session["collected_info"] = collected
+            collected = self._update_collected(
+                session,
+                {
+                    key: value
+                    for key, value in extracted.items()
+                    if value and value != "null" and value != "unknown"
+                },
+            )
 
         # Check what we have vs what we need
         missing = self._get_missing_fields(collected)
@@ -1390,123 +2046,120 @@ To secure your transaction, an OTP has been sent to your registered device. Plea
         return self._build_gathering_response(collected, missing)
 
     async def _extract_travel_info(
-        self, message: str, current_info: Dict
+        self, message: str, current_info: Dict, msg_lower: Optional[str] = None
     ) -> Optional[Dict]:
-        """Use LLM to extract travel information from message."""
-
-        # For short/simple messages, try simple extraction first (faster, more reliable)
-        if len(message.strip()) < 30 or len(message.split()) <= 4:
-            simple_result = self._simple_extract(message)
-            if simple_result:
+        """
+        Use LLM to extract travel information from message.
+        msg_lower is the caller's message.lower().strip(), computed here if omitted.
+        """
+        if msg_lower is None:
+            msg_lower = message.lower().strip()
+
+        # Pattern extraction first - short messages, or ones where every field the
+        # user mentions was already matched, don't need the LLM at all
+        simple_result = self._simple_extract(message, msg_lower)
+        if simple_result:
+            if len(message.strip()) < 30 or len(message.split()) <= 4:
                 logger.info(
                     f"Using simple extraction for short message: {simple_result}"
                 )
                 return simple_result
+            if _simple_extract_covers(msg_lower, simple_result):
+                logger.info(
+                    f"Using simple extraction, all mentioned fields matched: {simple_result}"
+                )
+                return simple_result
+        logger.info("Simple extraction incomplete - falling back to LLM extraction")
 
         current_date = datetime.now().strftime("%Y-%m-%d")
+        current_json = (
+            orjson.dumps(current_info, default=str, option=orjson.OPT_SORT_KEYS).decode()
+            if current_info
+            else "{}"
+        )
 
-        prompt = f"""Extract travel info from the user message. Output ONLY a JSON object, nothing else.
-
-User message: "{message}"
-Current info: {json.dumps(current_info) if current_info else "{}"}
-Today: {current_date}
-
-Output this exact JSON format with extracted values (use null if not mentioned):
-{{"destination": null, "origin": null, "travel_dates": null, "travelers": null, "budget_usd": null, "cabin_class": null, "preferences": null}}
-
-Examples:
-- "Paris" -> {{"destination": "Paris", "origin": null, "travel_dates": null, "travelers": null, "budget_usd": null, "cabin_class": null, "preferences": null}}
-- "next month" -> {{"destination": null, "origin": null, "travel_dates": {{"start": "2026-03-21", "end": "2026-03-26"}}, "travelers": null, "budget_usd": null, "cabin_class": null, "preferences": null}}
-- "2 people" -> {{"destination": null, "origin": null, "travel_dates": null, "travelers": 2, "budget_usd": null, "cabin_class": null, "preferences": null}}
-
-Output JSON only:"""
+        # Same (normalized) message against the same info on the same day -> reuse
+        normalized = " ".join(msg_lower.split())
+        cache_key = hashlib.blake2b(
+            f"{current_date}\x00{current_json}\x00{normalized}".encode(), digest_size=16
+        ).hexdigest()
+        cached = self._extract_cache.get(cache_key)
+        if cached is not None:
+            self._extract_cache.move_to_end(cache_key)
+            logger.info("Extraction cache hit")
+            return orjson.loads(cached)
+
+        user_prompt = f"""User message: "{message}"
+Current info: {current_json}
+Today: {current_date}"""
 
         try:
             start_time = time.time()
-            async with httpx.AsyncClient(timeout=OPENROUTER_TIMEOUT) as client:
-                resp = await client.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": OPENROUTER_MODEL,
-                        "messages": [{"role": "user", "content": prompt}],
-                        "temperature": 0.1
-                    }
-                )
-                resp.raise_for_status()
-                data = resp.json()
-                response_text = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+            client = await _get_client()
+            # Stream and stop at the closing brace instead of waiting for any
+            # trailing explanation the model adds after the JSON
+            response_text, json_text = await _stream_json_object(
+                client,
+                {
+                    "model": OPENROUTER_MODEL,
+                    "messages": [
+                        {"role": "system", "content": _EXTRACT_SYSTEM_PROMPT},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    # One short JSON object - cap generation and decode greedily
+                    "max_tokens": 120,
+                    "temperature": 0,
+                    "top_p": 1,
+                    # JSON mode - providers that support it emit a bare object
+                    "response_format": {"type": "json_object"},
+                },
+            )
 
             duration = time.time() - start_time
 
             log_llm_call(
-                logger, OPENROUTER_MODEL, prompt[:200], response_text[:200], duration
+                logger, OPENROUTER_MODEL, user_prompt[:200], response_text[:200], duration
             )
 
-            # Extract JSON - handle various LLM output formats
-            json_text = response_text
-
-            # Remove LLM thinking tags if present
-            if "<think>" in json_text:
-                json_text = re.sub(
-                    r"<think>.*?</think>", "", json_text, flags=re.DOTALL
-                )
-
-            # Try to extract JSON from code blocks
-            if "```json" in json_text:
-                json_text = json_text.split("```json")[1].split("```")[0]
-            elif "```" in json_text:
-                json_text = json_text.split("```")[1].split("```")[0]
-
-            # Try to find JSON object directly
-            json_text = json_text.strip()
-            if not json_text.startswith("{"):
-                # Look for JSON object in the text
-                match = re.search(r"\{[\s\S]*\}", json_text, re.DOTALL)
-                if match:
-                    json_text = match.group(0)
-                    # Handle trailing text by finding the last closing brace
-                    last_brace_index = json_text.rfind("}")
-                    if last_brace_index != -1:
-                        json_text = json_text[: last_brace_index + 1]
-
-            # Clean up common issues
-            json_text = json_text.strip()
-
-            if not json_text or not json_text.startswith("{"):
+            if json_text is not None:
+                result = orjson.loads(json_text)
+            else:
+                # Providers without JSON mode may still wrap or fence the object
+                result = await _parse_off_loop(_parse_travel_json, response_text)
+            if result is None:
                 logger.warning(f"No JSON found in response: {response_text[:100]}")
-                return self._simple_extract(message)
+                return simple_result
 
-            return json.loads(json_text)
+            self._extract_cache[cache_key] = orjson.dumps(result)
+            if len(self._extract_cache) > self._extract_cache_size:
+                self._extract_cache.popitem(last=False)
+            return result
 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.warning(
                 f"JSON parse error: {e} - Response: {response_text[:100] if 'response_text' in locals() else 'N/A'}"
             )
-            return self._simple_extract(message)
+            return simple_result
         except Exception as e:
             logger.warning(f"LLM extraction failed: {e}")
             # Fallback: simple pattern matching
-            return self._simple_extract(message)
+            return simple_result
 
     def _simple_extract_checkout_info(self, message: str) -> Dict:
         """Simple extraction for checkout info (name, email, phone)."""
         result = {}
         msg = message.strip()
 
+        contact = _scan_contact(msg)
+
         # Email pattern
-        email_match = re.search(r"[\w\.-]+@[\w\.-]+\.\w+", msg)
-        if email_match:
-            result["email"] = email_match.group()
+        if "email" in contact:
+            result["email"] = contact["email"]
             return result  # If email found, don't try to extract name
 
         # Phone pattern (simple) - check if it looks like a phone number
-        phone_match = re.search(r"[\+\d][\d\s\-\(\)\.]{7,}", msg)
-        if phone_match and sum(c.isdigit() for c in msg) >= 7:
-            result["phone"] = phone_match.group()
+        if "phone" in contact and sum(c.isdigit() for c in msg) >= 7:
+            result["phone"] = contact["phone"]
             return result  # If phone found, don't try to extract name
 
         # Name pattern: if message looks like a name (1-4 words, no special chars)
@@ -1557,234 +2210,49 @@ Output JSON only:"""
         session["stage"] = ConversationStage.PAYMENT_SELECTION
         return await self._build_payment_selection_response(session)
 
-    def _simple_extract(self, message: str) -> Dict:
-        """Simple pattern-based extraction as fallback."""
-        msg_lower = message.lower().strip()
+    def _simple_extract(self, message: str, msg_lower: Optional[str] = None) -> Dict:
+        """
+        Simple pattern-based extraction as fallback.
+        msg_lower is the caller's message.lower().strip(), computed here if omitted.
+        """
+        if msg_lower is None:
+            msg_lower = message.lower().strip()
         result = {}
 
-        # Destinations - comprehensive list
-        destinations = {
-            # Major international
-            "dubai": "Dubai",
-            "tokyo": "Tokyo",
-            "paris": "Paris",
-            "london": "London",
-            "bali": "Bali",
-            "rome": "Rome",
-            "new york": "New York",
-            "nyc": "New York",
-            "singapore": "Singapore",
-            "barcelona": "Barcelona",
-            "amsterdam": "Amsterdam",
-            "sydney": "Sydney",
-            "bangkok": "Bangkok",
-            "maldives": "Maldives",
-            "hawaii": "Hawaii",
-            "hong kong": "Hong Kong",
-            "los angeles": "Los Angeles",
-            "miami": "Miami",
-            "las vegas": "Las Vegas",
-            "cancun": "Cancun",
-            "greece": "Greece",
-            "santorini": "Santorini",
-            "italy": "Italy",
-            "spain": "Spain",
-            "japan": "Japan",
-            "thailand": "Thailand",
-            "france": "France",
-            "uk": "London",
-            "usa": "New York",
-            "australia": "Sydney",
-            "brazil": "Brazil",
-            "mexico": "Mexico",
-            "canada": "Canada",
-            "iceland": "Iceland",
-            "switzerland": "Switzerland",
-            "austria": "Austria",
-            "portugal": "Portugal",
-            "morocco": "Morocco",
-            "egypt": "Egypt",
-            "south africa": "South Africa",
-            # Indian cities
-            "bangalore": "Bangalore",
-            "bengaluru": "Bangalore",
-            "mumbai": "Mumbai",
-            "bombay": "Mumbai",
-            "delhi": "Delhi",
-            "new delhi": "New Delhi",
-            "chennai": "Chennai",
-            "madras": "Chennai",
-            "kolkata": "Kolkata",
-            "calcutta": "Kolkata",
-            "hyderabad": "Hyderabad",
-            "pune": "Pune",
-            "goa": "Goa",
-            "jaipur": "Jaipur",
-            "agra": "Agra",
-            "kerala": "Kerala",
-            "kochi": "Kochi",
-            "cochin": "Kochi",
-            "udaipur": "Udaipur",
-            "varanasi": "Varanasi",
-            "india": "India",
-            # More Asian
-            "seoul": "Seoul",
-            "kuala lumpur": "Kuala Lumpur",
-            "kl": "Kuala Lumpur",
-            "taipei": "Taipei",
-            "osaka": "Osaka",
-            "kyoto": "Kyoto",
-            "hanoi": "Hanoi",
-            "ho chi minh": "Ho Chi Minh City",
-            "saigon": "Ho Chi Minh City",
-            "phuket": "Phuket",
-            "bora bora": "Bora Bora",
-            "fiji": "Fiji",
-            # European
-            "berlin": "Berlin",
-            "munich": "Munich",
-            "prague": "Prague",
-            "vienna": "Vienna",
-            "budapest": "Budapest",
-            "athens": "Athens",
-            "lisbon": "Lisbon",
-            "madrid": "Madrid",
-            "milan": "Milan",
-            "venice": "Venice",
-            "florence": "Florence",
-            "dublin": "Dublin",
-            "edinburgh": "Edinburgh",
-            "copenhagen": "Copenhagen",
-            "stockholm": "Stockholm",
-            "oslo": "Oslo",
-            # Middle East
-            "abu dhabi": "Abu Dhabi",
-            "doha": "Doha",
-            "qatar": "Qatar",
-            "riyadh": "Riyadh",
-            "jeddah": "Jeddah",
-            "jerusalem": "Jerusalem",
-            "tel aviv": "Tel Aviv",
-            "oman": "Oman",
-            "muscat": "Muscat",
-        }
-        for key, value in destinations.items():
-            if key in msg_lower:
-                result["destination"] = value
-                logger.info(f"[SimpleExtract] Found destination: {value}")
-                break
+        # Destinations - one scan for any known alias
+        destination = _match_destination(msg_lower)
+        if destination:
+            result["destination"] = destination
+            logger.info(f"[SimpleExtract] Found destination: {result['destination']}")
 
-        # Travelers - handle various patterns
-        # First check for solo/single traveler phrases
-        solo_patterns = [
-            r"\bjust\s*me\b",
-            r"\bme\s*only\b",
-            r"\bonly\s*me\b",
-            r"\bmyself\b",
-            r"\bsolo\b",
-            r"\balone\b",
-            r"\bsingle\s*traveler\b",
-            r"\b1\s*person\b",
-            r"\bone\s*person\b",
-            r"\bjust\s*1\b",
-            r"\bjust\s*one\b",
-            r"\bonly\s*1\b",
-            r"\bonly\s*one\b",
-            r"\bi\s*am\s*alone\b",
-            r"\bgoing\s*alone\b",
-            r"^\s*1\s*$",
-            r"^\s*me\s*$",
-            r"^\s*one\s*$",
-            r"just\s*me\s*\(\s*1\s*\)",  # "Just me (1)" - exact match for suggestion
-        ]
-        for pattern in solo_patterns:
-            if re.search(pattern, msg_lower):
-                result["travelers"] = 1
-                logger.info(f"[SimpleExtract] Found solo traveler: 1")
-                break
+        # Travelers - solo, couple and numeric phrases in one scan
+        travelers = _match_travelers(msg_lower)
+        if travelers:
+            result["travelers"] = travelers[0]
+            logger.info(f"[SimpleExtract] Found travelers ({travelers[1]}): {travelers[0]}")
 
-        # Couple/pair patterns
-        if "travelers" not in result:
-            couple_patterns = [
-                r"\bcouple\b",
-                r"\bpair\b",
-                r"\bus\s*two\b",
-                r"\btwo\s*of\s*us\b",
-                r"\bmy\s*partner\b",
-                r"\bwith\s*spouse\b",
-                r"\bwith\s*wife\b",
-                r"\bwith\s*husband\b",
-            ]
-            for pattern in couple_patterns:
-                if re.search(pattern, msg_lower):
-                    result["travelers"] = 2
-                    logger.info(f"[SimpleExtract] Found couple: 2")
+        if "travelers" not in result and any(
+            word in msg_lower for word in _WORD_TRAVELER_CONTEXT
+        ):
+            for pattern, num in _WORD_TRAVELER_PATTERNS:
+                if pattern.search(msg_lower):
+                    result["travelers"] = num
+                    logger.info(f"[SimpleExtract] Found travelers (word): {num}")
                     break
 
-        # Numeric patterns - updated to match suggestions exactly
-        if "travelers" not in result:
-            traveler_patterns = [
-                # Match suggestions like "2 travelers", "4 travelers (family)"
-                r"(\d+)\s*travelers?\s*(?:\([^)]*\))?",
-                r"(\d+)\s*(?:people|persons|travellers|adults|guests|pax)",
-                r"(?:for|with)\s*(\d+)\s*(?:people|persons|travelers|adults)?",
-                r"(\d+)\s*of\s*us",
-                r"we\s*are\s*(\d+)",
-                r"group\s*of\s*(\d+)",  # "Group of 6"
-                r"family\s*of\s*(\d+)",
-                r"^\s*(\d+)\s*$",  # Just a number
-            ]
-            for pattern in traveler_patterns:
-                match = re.search(pattern, msg_lower)
-                if match:
-                    num = int(match.group(1))
-                    if 1 <= num <= 20:
-                        result["travelers"] = num
-                        logger.info(f"[SimpleExtract] Found travelers: {num}")
-                        break
-
-        # Word-based numbers for travelers
-        word_nums = {
-            "one": 1,
-            "two": 2,
-            "three": 3,
-            "four": 4,
-            "five": 5,
-            "six": 6,
-            "seven": 7,
-            "eight": 8,
-            "nine": 9,
-            "ten": 10,
-            "a": 1,
-            "an": 1,
-            "couple": 2,
-            "few": 3,
-        }
-
-        if "travelers" not in result:
-            for word, num in word_nums.items():
-                # Match word + people/travelers context (skip a/an/couple/few alone)
-                if word not in ["a", "an", "couple", "few"]:
-                    if re.search(
-                        rf"\b{word}\b.*(?:people|person|travelers|adults|of us)",
-                        msg_lower,
-                    ):
-                        result["travelers"] = num
-                        logger.info(f"[SimpleExtract] Found travelers (word): {num}")
-                        break
-
         # Dates - comprehensive pattern matching
-        today = datetime.now()
+        today = date.today()
         dates_found = False
 
         # Helper to parse number from word or digit
         def parse_num(s):
-            return word_nums.get(s.lower(), int(s) if s.isdigit() else 1)
+            return _WORD_NUMS.get(s.lower(), int(s) if s.isdigit() else 1)
 
         # "in X days/weeks/months" or just "X days/weeks/months" pattern
-        time_pattern = re.search(
-            r"(?:in\s+)?(\d+|one|two|three|four|five|six|seven|eight|nine|ten|a|an|couple|few)\s+(day|days|week|weeks|month|months)(?:\s+(?:from now|later|away|time))?",
-            msg_lower,
+        time_pattern = (
+            _RELATIVE_TIME_RE.search(msg_lower)
+            if any(unit in msg_lower for unit in ("day", "week", "month"))
+            else None
         )
         if time_pattern:
             num = parse_num(time_pattern.group(1))
@@ -1798,8 +2266,8 @@ Output JSON only:"""
                 start = today + timedelta(days=num * 30)
 
             result["travel_dates"] = {
-                "start": start.strftime("%Y-%m-%d"),
-                "end": (start + timedelta(days=5)).strftime("%Y-%m-%d"),
+                "start": start.isoformat(),
+                "end": (start + timedelta(days=5)).isoformat(),
             }
             dates_found = True
             logger.info(f"[SimpleExtract] Found dates: {num} {unit}")
@@ -1808,16 +2276,16 @@ Output JSON only:"""
         if not dates_found and "tomorrow" in msg_lower:
             start = today + timedelta(days=1)
             result["travel_dates"] = {
-                "start": start.strftime("%Y-%m-%d"),
-                "end": (start + timedelta(days=3)).strftime("%Y-%m-%d"),
+                "start": start.isoformat(),
+                "end": (start + timedelta(days=3)).isoformat(),
             }
             dates_found = True
             logger.info(f"[SimpleExtract] Found dates: tomorrow")
 
         if not dates_found and ("today" in msg_lower or "tonight" in msg_lower):
             result["travel_dates"] = {
-                "start": today.strftime("%Y-%m-%d"),
-                "end": (today + timedelta(days=3)).strftime("%Y-%m-%d"),
+                "start": today.isoformat(),
+                "end": (today + timedelta(days=3)).isoformat(),
             }
             dates_found = True
             logger.info(f"[SimpleExtract] Found dates: today")
@@ -1826,8 +2294,8 @@ Output JSON only:"""
         if not dates_found and "next week" in msg_lower:
             start = today + timedelta(days=7)
             result["travel_dates"] = {
-                "start": start.strftime("%Y-%m-%d"),
-                "end": (start + timedelta(days=5)).strftime("%Y-%m-%d"),
+                "start": start.isoformat(),
+                "end": (start + timedelta(days=5)).isoformat(),
             }
             dates_found = True
             logger.info(f"[SimpleExtract] Found dates: next week")
@@ -1835,120 +2303,85 @@ Output JSON only:"""
         if not dates_found and "next month" in msg_lower:
             start = today + timedelta(days=30)
             result["travel_dates"] = {
-                "start": start.strftime("%Y-%m-%d"),
-                "end": (start + timedelta(days=5)).strftime("%Y-%m-%d"),
+                "start": start.isoformat(),
+                "end": (start + timedelta(days=5)).isoformat(),
             }
             dates_found = True
             logger.info(f"[SimpleExtract] Found dates: next month")
 
         if not dates_found and "next year" in msg_lower:
-            start = datetime(today.year + 1, 1, 15)
+            start = date(today.year + 1, 1, 15)
             result["travel_dates"] = {
-                "start": start.strftime("%Y-%m-%d"),
-                "end": (start + timedelta(days=7)).strftime("%Y-%m-%d"),
+                "start": start.isoformat(),
+                "end": (start + timedelta(days=7)).isoformat(),
             }
             dates_found = True
             logger.info(f"[SimpleExtract] Found dates: next year")
 
         # Weekend patterns
-        if not dates_found:
-            weekend_match = re.search(
-                r"(this|next|coming|upcoming)\s*weekend", msg_lower
-            )
-            if weekend_match or "weekend" in msg_lower:
-                days_until_sat = (5 - today.weekday()) % 7
-                if days_until_sat == 0:
-                    days_until_sat = 7
-                # "next weekend" means the weekend after this one
-                if weekend_match and weekend_match.group(1) == "next":
-                    days_until_sat += 7
-                start = today + timedelta(days=days_until_sat)
-                result["travel_dates"] = {
-                    "start": start.strftime("%Y-%m-%d"),
-                    "end": (start + timedelta(days=2)).strftime("%Y-%m-%d"),
-                }
-                dates_found = True
-                logger.info(f"[SimpleExtract] Found dates: weekend")
+        if not dates_found and "weekend" in msg_lower:
+            weekend_match = _WEEKEND_RE.search(msg_lower)
+            days_until_sat = (5 - today.weekday()) % 7
+            if days_until_sat == 0:
+                days_until_sat = 7
+            # "next weekend" means the weekend after this one
+            if weekend_match and weekend_match.group(1) == "next":
+                days_until_sat += 7
+            start = today + timedelta(days=days_until_sat)
+            result["travel_dates"] = {
+                "start": start.isoformat(),
+                "end": (start + timedelta(days=2)).isoformat(),
+            }
+            dates_found = True
+            logger.info(f"[SimpleExtract] Found dates: weekend")
+
+        # The month-based patterns below all need a month name somewhere
+        month_match = None if dates_found else _MONTH_RE.search(msg_lower)
 
         # Explicit date range patterns like "March 15-20"
-        if not dates_found:
-            explicit_match = re.search(
-                r"(january|february|march|april|may|june|july|august|september|october|november|december|jan|feb|mar|apr|jun|jul|aug|sep|oct|nov|dec)\s+(\d{1,2})(?:st|nd|rd|th)?\s*(?:-|to)\s*(?:\w+\s+)?(\d{1,2})(?:st|nd|rd|th)?",
-                msg_lower
-            )
+        if month_match:
+            explicit_match = _EXPLICIT_RANGE_RE.search(msg_lower)
             if explicit_match:
                 month_str = explicit_match.group(1)
                 start_day = int(explicit_match.group(2))
                 end_day = int(explicit_match.group(3))
 
-                # very crude month to num mapping
-                m_map = {"january":1, "jan":1, "february":2, "feb":2, "march":3, "mar":3, "april":4, "apr":4, "may":5, "june":6, "jun":6, "july":7, "jul":7, "august":8, "aug":8, "september":9, "sep":9, "october":10, "oct":10, "november":11, "nov":11, "december":12, "dec":12}
-                month_num = m_map.get(month_str, today.month)
+                month_num = _MONTHS.get(month_str, today.month)
 
                 year = today.year
                 if month_num < today.month:
                     year += 1
 
                 try:
-                    start_date = datetime(year, month_num, start_day)
-                    end_date = datetime(year, month_num, end_day) if end_day >= start_day else datetime(year, month_num + 1 if month_num < 12 else 1, end_day)
+                    start_date = date(year, month_num, start_day)
+                    end_date = date(year, month_num, end_day) if end_day >= start_day else date(year, month_num + 1 if month_num < 12 else 1, end_day)
 
                     result["travel_dates"] = {
-                        "start": start_date.strftime("%Y-%m-%d"),
-                        "end": end_date.strftime("%Y-%m-%d"),
+                        "start": start_date.isoformat(),
+                        "end": end_date.isoformat(),
                     }
                     dates_found = True
                     logger.info(f"[SimpleExtract] Found dates: explicit range")
                 except ValueError:
                     pass
 
-        # Months dictionary
-        months = {
-            "january": 1,
-            "february": 2,
-            "march": 3,
-            "april": 4,
-            "may": 5,
-            "june": 6,
-            "july": 7,
-            "august": 8,
-            "september": 9,
-            "october": 10,
-            "november": 11,
-            "december": 12,
-            "jan": 1,
-            "feb": 2,
-            "mar": 3,
-            "apr": 4,
-            "jun": 6,
-            "jul": 7,
-            "aug": 8,
-            "sep": 9,
-            "sept": 9,
-            "oct": 10,
-            "nov": 11,
-            "dec": 12,
-        }
-
         # Date range within month FIRST (e.g., "March 15-20", "March 15 to 20")
         # Check this before month range to avoid "15-20" being parsed as months
-        if not dates_found:
-            range_match = re.search(
-                r"(\w+)\s+(\d{1,2})\s*(?:-|to)\s*(\d{1,2})", msg_lower
-            )
-            if range_match and range_match.group(1) in months:
-                month_num = months[range_match.group(1)]
+        if not dates_found and month_match:
+            range_match = _DAY_RANGE_RE.search(msg_lower)
+            if range_match and range_match.group(1) in _MONTHS:
+                month_num = _MONTHS[range_match.group(1)]
                 start_day = int(range_match.group(2))
                 end_day = int(range_match.group(3))
                 year = today.year
                 if month_num < today.month:
                     year += 1
                 try:
-                    start = datetime(year, month_num, start_day)
-                    end = datetime(year, month_num, end_day)
+                    start = date(year, month_num, start_day)
+                    end = date(year, month_num, end_day)
                     result["travel_dates"] = {
-                        "start": start.strftime("%Y-%m-%d"),
-                        "end": end.strftime("%Y-%m-%d"),
+                        "start": start.isoformat(),
+                        "end": end.isoformat(),
                     }
                     dates_found = True
                     logger.info(
@@ -1958,97 +2391,90 @@ Output JSON only:"""
                     pass
 
         # Month range pattern (e.g., "March to April", "from March to May")
-        if not dates_found:
-            month_range = re.search(
-                r"(?:from\s+)?(\w+)\s+(?:to|through|thru|-)\s+(\w+)", msg_lower
-            )
+        if not dates_found and month_match:
+            month_range = _MONTH_RANGE_RE.search(msg_lower)
             if month_range:
                 m1, m2 = month_range.group(1), month_range.group(2)
-                if m1 in months and m2 in months:
+                if m1 in _MONTHS and m2 in _MONTHS:
                     year = today.year
-                    if months[m1] < today.month:
+                    if _MONTHS[m1] < today.month:
                         year += 1
-                    start = datetime(year, months[m1], 15)
-                    end_year = year if months[m2] >= months[m1] else year + 1
-                    end = datetime(end_year, months[m2], 15)
+                    start = date(year, _MONTHS[m1], 15)
+                    end_year = year if _MONTHS[m2] >= _MONTHS[m1] else year + 1
+                    end = date(end_year, _MONTHS[m2], 15)
                     result["travel_dates"] = {
-                        "start": start.strftime("%Y-%m-%d"),
-                        "end": end.strftime("%Y-%m-%d"),
+                        "start": start.isoformat(),
+                        "end": end.isoformat(),
                     }
                     dates_found = True
                     logger.info(f"[SimpleExtract] Found month range: {m1} to {m2}")
 
         # Single month name (e.g., "in March", "March 2026", "early March", "around March")
-        if not dates_found:
-            for month_name, month_num in months.items():
-                if re.search(rf"\b{month_name}\b", msg_lower):
-                    # Check for year
-                    year_match = re.search(r"20(\d{2})", message)
-                    year = int(f"20{year_match.group(1)}") if year_match else today.year
-
-                    # If month already passed this year, use next year
-                    if month_num < today.month and year == today.year:
-                        year += 1
-
-                    # Check for specific day (e.g., "March 15" or "15th March")
-                    day_match = re.search(
-                        rf"{month_name}\s+(\d{{1,2}})|(\d{{1,2}})\s*(st|nd|rd|th)?\s*(of\s+)?{month_name}",
-                        msg_lower,
-                    )
-                    if day_match:
-                        day = int(day_match.group(1) or day_match.group(2))
-                    elif (
-                        "early" in msg_lower
-                        or "beginning" in msg_lower
-                        or "start of" in msg_lower
-                    ):
-                        day = 5
-                    elif "mid" in msg_lower or "middle" in msg_lower:
-                        day = 15
-                    elif "late" in msg_lower or "end of" in msg_lower:
-                        day = 25
-                    elif (
-                        "around" in msg_lower
-                        or "sometime" in msg_lower
-                        or "maybe" in msg_lower
-                    ):
-                        day = 15
-                    else:
-                        day = 15  # Default to middle of month
-
-                    try:
-                        start = datetime(year, month_num, min(day, 28))
-                        result["travel_dates"] = {
-                            "start": start.strftime("%Y-%m-%d"),
-                            "end": (start + timedelta(days=5)).strftime("%Y-%m-%d"),
-                        }
-                        dates_found = True
-                        logger.info(
-                            f"[SimpleExtract] Found dates: {month_name} {day}, {year}"
-                        )
-                    except ValueError:
-                        day = 28
-                        start = datetime(year, month_num, day)
-                        result["travel_dates"] = {
-                            "start": start.strftime("%Y-%m-%d"),
-                            "end": (start + timedelta(days=5)).strftime("%Y-%m-%d"),
-                        }
-                        dates_found = True
-                    break
+        if not dates_found and month_match:
+            month_name = month_match.group()
+            month_num = _MONTHS[month_name]
+            # Check for year
+            year_match = _YEAR_PREFIX_RE.search(message)
+            year = int(f"20{year_match.group(1)}") if year_match else today.year
+
+            # If month already passed this year, use next year
+            if month_num < today.month and year == today.year:
+                year += 1
+
+            # Check for specific day (e.g., "March 15" or "15th March")
+            day = _month_day(msg_lower, month_name)
+            if day is None:
+                if (
+                    "early" in msg_lower
+                    or "beginning" in msg_lower
+                    or "start of" in msg_lower
+                ):
+                    day = 5
+                elif "mid" in msg_lower or "middle" in msg_lower:
+                    day = 15
+                elif "late" in msg_lower or "end of" in msg_lower:
+                    day = 25
+                elif (
+                    "around" in msg_lower
+                    or "sometime" in msg_lower
+                    or "maybe" in msg_lower
+                ):
+                    day = 15
+                else:
+                    day = 15  # Default to middle of month
+
+            try:
+                start = date(year, month_num, min(day, 28))
+                result["travel_dates"] = {
+                    "start": start.isoformat(),
+                    "end": (start + timedelta(days=5)).isoformat(),
+                }
+                dates_found = True
+                logger.info(
+                    f"[SimpleExtract] Found dates: {month_name} {day}, {year}"
+                )
+            except ValueError:
+                day = 28
+                start = date(year, month_num, day)
+                result["travel_dates"] = {
+                    "start": start.isoformat(),
+                    "end": (start + timedelta(days=5)).isoformat(),
+                }
+                dates_found = True
 
         # ISO date pattern (e.g., "2026-03-15")
         if not dates_found:
-            iso_match = re.search(r"(\d{4})-(\d{1,2})-(\d{1,2})", message)
+            iso_match = _ISO_DATE_RE.search(message)
             if iso_match:
                 try:
-                    start = datetime(
+                    start = date(
                         int(iso_match.group(1)),
                         int(iso_match.group(2)),
                         int(iso_match.group(3)),
                     )
                     result["travel_dates"] = {
-                        "start": start.strftime("%Y-%m-%d"),
-                        "end": (start + timedelta(days=5)).strftime("%Y-%m-%d"),
+                        "start": start.isoformat(),
+                        "end": (start + timedelta(days=5)).isoformat(),
                     }
                     dates_found = True
                     logger.info(f"[SimpleExtract] Found ISO date: {iso_match.group(0)}")
@@ -2057,7 +2483,7 @@ Output JSON only:"""
 
         # US date format (e.g., "03/15/2026", "3/15/26")
         if not dates_found:
-            us_date = re.search(r"(\d{1,2})/(\d{1,2})/(\d{2,4})", message)
+            us_date = _US_DATE_RE.search(message)
             if us_date:
                 try:
                     month = int(us_date.group(1))
@@ -2065,10 +2491,10 @@ Output JSON only:"""
                     year = int(us_date.group(3))
                     if year < 100:
                         year += 2000
-                    start = datetime(year, month, day)
+                    start = date(year, month, day)
                     result["travel_dates"] = {
-                        "start": start.strftime("%Y-%m-%d"),
-                        "end": (start + timedelta(days=5)).strftime("%Y-%m-%d"),
+                        "start": start.isoformat(),
+                        "end": (start + timedelta(days=5)).isoformat(),
                     }
                     dates_found = True
                     logger.info(f"[SimpleExtract] Found US date: {us_date.group(0)}")
@@ -2077,7 +2503,7 @@ Output JSON only:"""
 
         # European date format (e.g., "15/03/2026", "15.03.2026")
         if not dates_found:
-            eu_date = re.search(r"(\d{1,2})[./](\d{1,2})[./](\d{2,4})", message)
+            eu_date = _EU_DATE_RE.search(message)
             if eu_date:
                 try:
                     day = int(eu_date.group(1))
@@ -2087,10 +2513,10 @@ Output JSON only:"""
                         year += 2000
                     # Validate - if day > 12 and month <= 12, it's likely EU format
                     if day > 12 and month <= 12:
-                        start = datetime(year, month, day)
+                        start = date(year, month, day)
                         result["travel_dates"] = {
-                            "start": start.strftime("%Y-%m-%d"),
-                            "end": (start + timedelta(days=5)).strftime("%Y-%m-%d"),
+                            "start": start.isoformat(),
+                            "end": (start + timedelta(days=5)).isoformat(),
                         }
                         dates_found = True
                         logger.info(
@@ -2101,18 +2527,18 @@ Output JSON only:"""
 
         # Year only (e.g., "in 2026", "2027")
         if not dates_found:
-            year_only = re.search(r"\b(202[5-9]|203[0-9])\b", message)
+            year_only = _YEAR_ONLY_RE.search(message)
             if year_only:
                 year = int(year_only.group(1))
                 # Default to mid-year
                 start = (
-                    datetime(year, 6, 15)
+                    date(year, 6, 15)
                     if year > today.year
                     else today + timedelta(days=30)
                 )
                 result["travel_dates"] = {
-                    "start": start.strftime("%Y-%m-%d"),
-                    "end": (start + timedelta(days=7)).strftime("%Y-%m-%d"),
+                    "start": start.isoformat(),
+                    "end": (start + timedelta(days=7)).isoformat(),
                 }
                 dates_found = True
                 logger.info(f"[SimpleExtract] Found year: {year}")
@@ -2121,37 +2547,37 @@ Output JSON only:"""
         if not dates_found:
             if "summer" in msg_lower:
                 year = today.year if today.month < 6 else today.year + 1
-                start = datetime(year, 7, 1)
+                start = date(year, 7, 1)
                 result["travel_dates"] = {
-                    "start": start.strftime("%Y-%m-%d"),
-                    "end": (start + timedelta(days=7)).strftime("%Y-%m-%d"),
+                    "start": start.isoformat(),
+                    "end": (start + timedelta(days=7)).isoformat(),
                 }
                 dates_found = True
                 logger.info(f"[SimpleExtract] Found season: summer")
             elif "winter" in msg_lower:
                 year = today.year if today.month < 12 else today.year + 1
-                start = datetime(year, 12, 20)
+                start = date(year, 12, 20)
                 result["travel_dates"] = {
-                    "start": start.strftime("%Y-%m-%d"),
-                    "end": (start + timedelta(days=7)).strftime("%Y-%m-%d"),
+                    "start": start.isoformat(),
+                    "end": (start + timedelta(days=7)).isoformat(),
                 }
                 dates_found = True
                 logger.info(f"[SimpleExtract] Found season: winter")
             elif "spring" in msg_lower:
                 year = today.year if today.month < 3 else today.year + 1
-                start = datetime(year, 4, 1)
+                start = date(year, 4, 1)
                 result["travel_dates"] = {
-                    "start": start.strftime("%Y-%m-%d"),
-                    "end": (start + timedelta(days=7)).strftime("%Y-%m-%d"),
+                    "start": start.isoformat(),
+                    "end": (start + timedelta(days=7)).isoformat(),
                 }
                 dates_found = True
                 logger.info(f"[SimpleExtract] Found season: spring")
             elif "fall" in msg_lower or "autumn" in msg_lower:
                 year = today.year if today.month < 9 else today.year + 1
-                start = datetime(year, 10, 1)
+                start = date(year, 10, 1)
                 result["travel_dates"] = {
-                    "start": start.strftime("%Y-%m-%d"),
-                    "end": (start + timedelta(days=7)).strftime("%Y-%m-%d"),
+                    "start": start.isoformat(),
+                    "end": (start + timedelta(days=7)).isoformat(),
                 }
                 dates_found = True
                 logger.info(f"[SimpleExtract] Found season: fall")
@@ -2197,7 +2623,7 @@ Output JSON only:"""
             result["cabin_class"] = "economy"
 
         # Budget
-        budget_match = re.search(r"\$\s*(\d+[,\d]*)", message)
+        budget_match = _BUDGET_RE.search(message) if "$" in message else None
         if budget_match:
             result["budget_usd"] = int(budget_match.group(1).replace(",", ""))
             logger.info(f"[SimpleExtract] Found budget: {result['budget_usd']}")
@@ -3275,6 +3701,7 @@ Thank you for using AP2 Travel! Would you like to plan another trip?""",
     async def close(self):
         """Cleanup resources."""
         await self.a2a_client.close()
+        await close_http_client()
 
 
 # Singleton instance
@@ -19,6 +19,8 @@ LOG_DIR.mkdir(exist_ok=True)
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY", "")
 OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "arcee-ai/trinity-large-preview:free")
 OPENROUTER_TIMEOUT = int(os.getenv("OPENROUTER_TIMEOUT", "60"))
+# Max LLM completions in flight at once across all sessions
+OPENROUTER_CONCURRENCY = int(os.getenv("OPENROUTER_CONCURRENCY", "4"))
 
 # Server Ports
 SHOPPING_AGENT_PORT = int(os.getenv("SHOPPING_AGENT_PORT", "8000"))
@@ -54,6 +56,12 @@ WALLET_PRIVATE_KEY = os.getenv("WALLET_PRIVATE_KEY", "4f0aaa5ad4d500f82c6945e4c2
 # Demo Mode
 DEMO_MODE = os.getenv("DEMO_MODE", "true").lower() == "true"
 
+# Simulated payment-network latency in seconds (0 disables the pause)
+DEMO_AUTH_DELAY_SEC = float(os.getenv("DEMO_AUTH_DELAY_SEC", "0"))
+
+# Shopping sessions idle longer than this are evicted (seconds)
+SESSION_IDLE_TTL_SEC = int(os.getenv("SESSION_IDLE_TTL_SEC", "3600"))
+
 # Merchant Configuration
 MERCHANT_ID = "voyager_travel_merchants"
 MERCHANT_NAME = "Voyager Travel Merchants"
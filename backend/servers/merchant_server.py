@@ -7,6 +7,7 @@ from pathlib import Path
 from datetime import datetime
 
 from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 import sys
@@ -17,7 +18,7 @@ from config import (
     MERCHANT_AGENT_CARD,
     MERCHANT_AGENT_PORT,
 )
-from agents.merchant_agent import merchant_agent
+from agents.merchant_agent import merchant_agent, close_http_client
 from utils import get_logger, build_a2a_response, extract_mandate_from_message
 
 logger = get_logger("MerchantServer")
@@ -144,11 +145,13 @@ async def a2a_endpoint(request: Request):
             }
         )
 
-        return build_a2a_response(
+        # Package payloads are plain JSON-native dicts - serialize them directly
+        # with orjson instead of FastAPI's jsonable_encoder + json.dumps pass
+        return ORJSONResponse(build_a2a_response(
             request_id,
             text=f"Generated {len(result.get('packages', []))} travel packages",
             data=result
-        )
+        ))
 
     except Exception as e:
         logger.error(f"A2A endpoint error: {e}", exc_info=True)
@@ -198,12 +201,12 @@ async def search_catalog(
         "expires_at": (datetime.now() + timedelta(minutes=30)).isoformat()
     }
 
-    result = await merchant_agent.process_intent_mandate(
+    body = await merchant_agent.process_intent_mandate_json(
         intent_mandate=intent,
         shopping_agent_id="test_agent"
     )
 
-    return result
+    return Response(content=body, media_type="application/json")
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -218,6 +221,7 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Merchant Agent server shutting down")
+    await close_http_client()
 
 
 if __name__ == "__main__":
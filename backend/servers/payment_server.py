@@ -5,7 +5,7 @@ Payment processor and settlement with AP2 support
 
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
@@ -40,6 +40,16 @@ app.add_middleware(
 )
 
 
+# ═══════════════════════════════════════════════════════════════
+# Request Models
+# ═══════════════════════════════════════════════════════════════
+
+class PaymentBatchItem(BaseModel):
+    payment_mandate: Dict[str, Any]
+    cart_mandate: Dict[str, Any]
+    intent_mandate: Dict[str, Any]
+
+
 # ═══════════════════════════════════════════════════════════════
 # Well-Known & Health Endpoints
 # ═══════════════════════════════════════════════════════════════
@@ -166,6 +176,19 @@ async def a2a_endpoint(request: Request):
 # Direct API Endpoints
 # ═══════════════════════════════════════════════════════════════
 
+@app.post("/api/payments/batch")
+async def process_payment_batch(items: List[PaymentBatchItem]):
+    """
+    Process a batch of payment mandates concurrently.
+    Results are returned in the same order as the request items.
+    """
+    results = await payment_agent.process_payment_mandates_batch([
+        (item.payment_mandate, item.cart_mandate, item.intent_mandate)
+        for item in items
+    ])
+    return {"results": results}
+
+
 @app.get("/api/transactions")
 async def list_transactions():
     """
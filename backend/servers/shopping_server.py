@@ -7,7 +7,7 @@ import json
 import asyncio
 from pathlib import Path
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timezone
 
 from fastapi import FastAPI, HTTPException, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
@@ -24,7 +24,7 @@ from config import (
     LOG_DIR,
 )
 from agents.shopping_agent import shopping_agent
-from utils import get_logger, build_a2a_response, extract_mandate_from_message
+from utils import get_logger, build_a2a_response, extract_mandate_from_message, A2AClient
 
 logger = get_logger("ShoppingServer")
 
@@ -249,7 +249,12 @@ async def get_session(session_id: str):
     session = shopping_agent.get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
-    return session
+    # Underscore-prefixed keys are internal caches, not session state
+    public = {key: value for key, value in session.items() if not key.startswith("_")}
+    public["created_at"] = datetime.fromtimestamp(
+        session["created_at"] / 1e9, timezone.utc
+    ).isoformat()
+    return public
 
 
 @app.post("/api/reset-session")
@@ -360,8 +365,6 @@ async def get_agents():
     """
     Get information about all agents in the network.
     """
-    import httpx
-
     agents = []
     agent_ports = {
         "shopping_agent": 8000,
@@ -370,21 +373,24 @@ async def get_agents():
         "payment_agent": 8003
     }
 
-    async with httpx.AsyncClient(timeout=2.0) as client:
-        for agent_name, port in agent_ports.items():
-            try:
-                response = await client.get(f"http://localhost:{port}/.well-known/agent.json")
-                if response.status_code == 200:
-                    card = response.json()
-                    card["status"] = "online"
-                    card["port"] = port
-                    agents.append(card)
-            except Exception:
-                agents.append({
-                    "name": agent_name,
-                    "port": port,
-                    "status": "offline"
-                })
+    # Probe over the shared A2A keep-alive pool
+    client = A2AClient.shared_http_client()
+    for agent_name, port in agent_ports.items():
+        try:
+            response = await client.get(
+                f"http://localhost:{port}/.well-known/agent.json", timeout=2.0
+            )
+            if response.status_code == 200:
+                card = response.json()
+                card["status"] = "online"
+                card["port"] = port
+                agents.append(card)
+        except Exception:
+            agents.append({
+                "name": agent_name,
+                "port": port,
+                "status": "offline"
+            })
 
     return {"agents": agents}
 
@@ -393,15 +399,23 @@ async def get_agents():
 # Startup/Shutdown
 # ═══════════════════════════════════════════════════════════════
 
+_session_sweeper: Optional[asyncio.Task] = None
+
+
 @app.on_event("startup")
 async def startup_event():
+    global _session_sweeper
     logger.info(f"Shopping Agent server starting on port {SHOPPING_AGENT_PORT}")
+    _session_sweeper = asyncio.create_task(shopping_agent.run_session_sweeper())
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shopping Agent server shutting down")
+    if _session_sweeper:
+        _session_sweeper.cancel()
     await shopping_agent.close()
+    await A2AClient.close_shared_http_client()
 
 
 if __name__ == "__main__":
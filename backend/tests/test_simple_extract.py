@@ -0,0 +1,31 @@
+"""
+Regression tests for the pattern-based travel-info extractor.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents.shopping_agent import shopping_agent
+
+
+def test_origin_alias_is_not_taken_as_destination():
+    assert shopping_agent._simple_extract("from nyc to paris")["destination"] == "Paris"
+
+
+def test_destination_after_to_wins_over_origin():
+    assert shopping_agent._simple_extract("from paris to tokyo")["destination"] == "Tokyo"
+
+
+def test_traveler_unit_beats_trip_length():
+    message = "I want to go to Paris in March for 2 weeks with 4 adults and budget $5000"
+    assert shopping_agent._simple_extract(message)["travelers"] == 4
+
+
+def test_people_count_after_trip_length():
+    assert shopping_agent._simple_extract("for 2 weeks, 3 people")["travelers"] == 3
+
+
+def test_travelers_count_after_trip_days():
+    assert shopping_agent._simple_extract("trip for 3 days, 2 travelers")["travelers"] == 2
@@ -17,6 +17,7 @@ from .crypto import (
     generate_pnr
 )
 from .a2a_client import A2AClient, build_a2a_response, extract_mandate_from_message
+from .llm_stream import ThinkFilter, JsonObjectScanner, iter_sse_content
 
 __all__ = [
     # Logger
@@ -41,4 +42,8 @@ __all__ = [
     'A2AClient',
     'build_a2a_response',
     'extract_mandate_from_message',
+    # LLM streaming
+    'ThinkFilter',
+    'JsonObjectScanner',
+    'iter_sse_content',
 ]
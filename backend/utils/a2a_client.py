@@ -7,7 +7,7 @@ import httpx
 import json
 import uuid
 import time
-from typing import Any, Dict, Optional
+from typing import Any, ClassVar, Dict, Optional
 from datetime import datetime
 
 # AP2 Extension Header
@@ -21,14 +21,43 @@ class A2AClient:
     Includes AP2 extension headers for payment-related messages.
     """
 
+    # Keep-alive pool shared by every A2AClient so agent hops reuse connections
+    _shared_http: ClassVar[Optional[httpx.AsyncClient]] = None
+
     def __init__(
-        self, agent_name: str, agent_url: str, timeout: float = 30.0, logger=None
+        self,
+        agent_name: str,
+        agent_url: str,
+        timeout: float = 30.0,
+        logger=None,
+        http_client: Optional[httpx.AsyncClient] = None,
     ):
         self.agent_name = agent_name
         self.agent_url = agent_url
         self.timeout = timeout
         self.logger = logger
-        self.client = httpx.AsyncClient(timeout=timeout)
+        # An injected client is owned by the caller; otherwise use the shared pool
+        self._http_client = http_client
+
+    @classmethod
+    def shared_http_client(cls) -> httpx.AsyncClient:
+        """Return the shared keep-alive client, creating it on first use."""
+        if cls._shared_http is None or cls._shared_http.is_closed:
+            cls._shared_http = httpx.AsyncClient(
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+            )
+        return cls._shared_http
+
+    @classmethod
+    async def close_shared_http_client(cls) -> None:
+        """Close the shared keep-alive client."""
+        if cls._shared_http is not None:
+            await cls._shared_http.aclose()
+            cls._shared_http = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._http_client or self.shared_http_client()
 
     async def send_message(
         self,
@@ -120,7 +149,7 @@ class A2AClient:
 
         try:
             response = await self.client.post(
-                target_url, json=request_body, headers=headers
+                target_url, json=request_body, headers=headers, timeout=self.timeout
             )
             response.raise_for_status()
 
@@ -224,7 +253,7 @@ class A2AClient:
 
         start_time = time.time()
         response = await self.client.post(
-            target_url, json=request_body, headers=headers
+            target_url, json=request_body, headers=headers, timeout=self.timeout
         )
         response.raise_for_status()
         result = response.json()
@@ -294,7 +323,7 @@ class A2AClient:
 
         start_time = time.time()
         response = await self.client.post(
-            target_url, json=request_body, headers=headers
+            target_url, json=request_body, headers=headers, timeout=self.timeout
         )
         response.raise_for_status()
         result = response.json()
@@ -370,7 +399,7 @@ class A2AClient:
 
         start_time = time.time()
         response = await self.client.post(
-            target_url, json=request_body, headers=headers
+            target_url, json=request_body, headers=headers, timeout=self.timeout
         )
         response.raise_for_status()
         result = response.json()
@@ -394,21 +423,28 @@ class A2AClient:
 
     async def get_agent_card(self, base_url: str) -> Dict[str, Any]:
         """Fetch an agent's well-known card."""
-        response = await self.client.get(f"{base_url}/.well-known/agent.json")
+        response = await self.client.get(
+            f"{base_url}/.well-known/agent.json", timeout=self.timeout
+        )
         response.raise_for_status()
         return response.json()
 
     async def health_check(self, base_url: str) -> bool:
         """Check if an agent is healthy."""
         try:
-            response = await self.client.get(f"{base_url}/health")
+            response = await self.client.get(
+                f"{base_url}/health", timeout=self.timeout
+            )
             return response.status_code == 200
         except Exception:
             return False
 
     async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
+        """
+        Release this client. A no-op: the shared pool outlives any one instance
+        (close it once via close_shared_http_client on server shutdown) and an
+        injected client is left to its owner.
+        """
 
 
 def build_a2a_response(
@@ -6,6 +6,8 @@ Simulated VDC signing for demo purposes
 import hashlib
 import hmac
 import json
+import random
+import string
 import uuid
 import base64
 from typing import Any, Dict
@@ -130,17 +132,19 @@ def generate_device_signature(user_id: str, mandate_id: str) -> str:
     ).hexdigest()
 
 
+# Keyed merchant HMAC; copied per signature to skip re-deriving the key pads
+_MERCHANT_HMAC = hmac.new(f"{SECRET_KEY}-merchant".encode(), digestmod=hashlib.sha256)
+
+
 def generate_merchant_signature(merchant_id: str, cart_hash: str) -> str:
     """
     Generate merchant's signature on a cart.
     Proves the merchant attests to the cart contents and pricing.
     """
     data = f"{merchant_id}:{cart_hash}:{datetime.utcnow().isoformat()}"
-    return hmac.new(
-        f"{SECRET_KEY}-merchant".encode(),
-        data.encode(),
-        hashlib.sha256
-    ).hexdigest()
+    mac = _MERCHANT_HMAC.copy()
+    mac.update(data.encode())
+    return mac.hexdigest()
 
 
 def generate_transaction_id() -> str:
@@ -150,13 +154,13 @@ def generate_transaction_id() -> str:
 
 def generate_authorization_code() -> str:
     """Generate a simulated authorization code (6 digits)."""
-    import random
     return f"AUTH-{random.randint(100000, 999999)}"
 
 
+_PNR_ALPHABET = string.ascii_uppercase + string.digits
+
+
 def generate_pnr(prefix: str = "VY") -> str:
     """Generate a simulated PNR/confirmation code."""
-    import random
-    import string
-    chars = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+    chars = ''.join(random.choices(_PNR_ALPHABET, k=6))
     return f"{prefix}-{chars}"
@@ -0,0 +1,115 @@
+"""
+Streaming chat-completion helpers
+SSE delta parsing, <think> filtering and early JSON object detection
+"""
+
+from typing import List, Optional
+
+import httpx
+import orjson
+
+
+class ThinkFilter:
+    """Drop <think>...</think> spans from streamed text as it arrives.
+
+    Reasoning text is discarded chunk by chunk instead of being accumulated and
+    regex-stripped afterwards; a tag split across chunks is held back until
+    the next chunk completes it.
+    """
+
+    _OPEN = "<think>"
+    _CLOSE = "</think>"
+
+    def __init__(self):
+        self._inside = False
+        self._pending = ""
+
+    def feed(self, chunk: str) -> str:
+        """Return the visible part of chunk."""
+        text = self._pending + chunk
+        self._pending = ""
+        visible: List[str] = []
+        while text:
+            tag = self._CLOSE if self._inside else self._OPEN
+            idx = text.find(tag)
+            if idx >= 0:
+                if not self._inside:
+                    visible.append(text[:idx])
+                text = text[idx + len(tag):]
+                self._inside = not self._inside
+                continue
+            # Hold back a trailing prefix of the tag - it may finish next chunk
+            keep = 0
+            for k in range(min(len(tag) - 1, len(text)), 0, -1):
+                if text.endswith(tag[:k]):
+                    keep = k
+                    break
+            if not self._inside:
+                visible.append(text[:len(text) - keep])
+            self._pending = text[len(text) - keep:]
+            break
+        return "".join(visible)
+
+    def flush(self) -> str:
+        """Return any held-back visible text at the end of the stream."""
+        rest = "" if self._inside else self._pending
+        self._pending = ""
+        return rest
+
+
+class JsonObjectScanner:
+    """Incrementally locate the first complete top-level JSON object in streamed text.
+
+    Braces inside JSON strings are ignored.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """Append a chunk; return the JSON object text once its closing brace arrives."""
+        self.text += chunk
+        text = self.text
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            if self._start < 0:
+                if c == "{":
+                    self._start = i
+                    self._depth = 1
+            elif self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif c == "\\":
+                    self._escaped = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c == "{":
+                self._depth += 1
+            elif c == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._pos = i + 1
+                    return text[self._start:i + 1]
+        self._pos = len(text)
+        return None
+
+
+async def iter_sse_content(resp: httpx.Response):
+    """Yield the delta content chunks of a streaming chat completion response."""
+    async for line in resp.aiter_lines():
+        if not line.startswith("data: "):
+            continue
+        payload = line[6:]
+        if payload == "[DONE]":
+            break
+        choices = orjson.loads(payload).get("choices") or [{}]
+        content = choices[0].get("delta", {}).get("content")
+        if content:
+            yield content